@@ -5,16 +5,31 @@ Flask web application with embedded HTML, CSS, and JavaScript
 to provide a web interface for the Study Assistant.
 """
 
-from flask import Flask, request, jsonify, render_template_string
-from study_assistant import StudyAssistant
+from flask import Flask, Response, g, request, jsonify, render_template_string
+from study_assistant import StudyAssistant, InputTooLongError
+from responses import chat_reply
+from sessions import SessionStore
+from metrics import CONTENT_TYPE, AppMetrics
+from werkzeug.exceptions import RequestEntityTooLarge
 import json
+import time
 
 # Configure Flask for Vercel - disable static folder as Vercel uses public/ directory
 # All assets are embedded in HTML, so we don't need static files
 app = Flask(__name__, static_folder=None, static_url_path=None)
+# Request bodies over this size are answered with 413 before being read
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
 
 # Initialize assistant
-assistant = StudyAssistant()
+# Instrumented, so /metrics can report answers per category and time per stage
+assistant = StudyAssistant(instrument=True)
+
+# Per-session conversation histories, expired after inactivity and capped in number
+sessions = SessionStore(catalog=assistant.catalog)
+SESSION_COOKIE = 'study_session'
+
+# Prometheus metrics served at /metrics; recording them never takes a lock
+metrics = AppMetrics(assistant, sessions)
 
 # Ensure app is available at module level for Vercel detection
 __all__ = ['app']
@@ -480,6 +495,14 @@ HTML_TEMPLATE = """
                     body: JSON.stringify({ message: message })
                 });
 
+                if (response.status === 413) {
+                    // Message over the size limit: show the server's explanation
+                    const data = await response.json();
+                    hideLoading();
+                    addMessage(data.response, false);
+                    return;
+                }
+
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
@@ -514,11 +537,29 @@ HTML_TEMPLATE = """
 </html>
 """
 
+@app.before_request
+def start_timer():
+    """Note when the request started, for the latency histogram."""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def count_request(response):
+    """Count the request and its latency by route."""
+    rule = request.url_rule
+    route = rule.rule if rule is not None else 'unmatched'
+    metrics.observe_request(request.method, route, response.status_code,
+                            time.perf_counter() - g.request_started)
+    return response
+
 @app.route('/')
 def index():
     """Render the main chat interface."""
     return render_template_string(HTML_TEMPLATE)
 
+def message_too_long():
+    """Reject a message over the size limit before it reaches the assistant."""
+    return jsonify({'response': assistant.too_long_response()}), 413
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """Handle chat messages from the frontend."""
@@ -529,10 +570,22 @@ def chat():
         if not user_message:
             return jsonify({'response': 'Please enter a message.'}), 400
         
-        # Process the query using the Study Assistant
-        response = assistant.process_query(user_message)
+        # Find this student's session from the JSON body or the session cookie
+        session_id = sessions.resolve(data.get('session_id') or request.cookies.get(SESSION_COOKIE))
+        history = sessions.get(session_id)
+        
+        # Answer the query without touching shared state, then record the turn
+        # in this session's history (which has its own lock)
+        answer = assistant.respond(user_message)
+        assistant.record(user_message, answer, history)
         
-        return jsonify({'response': response})
+        # The response's JSON encoding is precomputed, so only the session ID is encoded here
+        reply = app.response_class(chat_reply(answer.response, session_id), mimetype='application/json')
+        reply.set_cookie(SESSION_COOKIE, session_id, max_age=int(sessions.ttl), httponly=True, samesite='Lax')
+        return reply
+    
+    except (InputTooLongError, RequestEntityTooLarge):
+        return message_too_long()
     
     except Exception as e:
         return jsonify({'response': f'An error occurred: {str(e)}'}), 500
@@ -542,6 +595,11 @@ def health():
     """Health check endpoint."""
     return jsonify({'status': 'healthy'})
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metrics in the Prometheus text format."""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 # Export app for Vercel
 # The app variable is already defined above and will be auto-detected by Vercel
 
@@ -0,0 +1,398 @@
+"""
+Keyword Matcher
+===============
+Multi-pattern keyword matching for the Study Assistant.
+All keyword lists are compiled into a single matcher so that every category
+mentioned in a query is found in one pass over the text. The matchers share
+the same interface: an Aho-Corasick automaton with substring semantics, a
+token index that only matches whole words and phrases, and a variant of the
+token index that compares word stems. Any of them can be wrapped in a
+FuzzyMatcher to also recognize misspelled keywords.
+
+Besides search(), which returns the set of groups found, every matcher has
+count(), which returns how many keyword occurrences of each group the text
+contains, for ranking intents by weight of evidence.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, Set
+
+from stemmer import stem
+
+# Words are runs of letters and digits; everything else separates them
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+# Long texts are searched in chunks of this many characters, so a search that
+# has already found a decisive keyword can stop early
+SEARCH_CHUNK = 2048
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word tokens."""
+    return TOKEN_PATTERN.findall(text)
+
+
+def stem_words(text: str) -> List[str]:
+    """Split text into word tokens and reduce each one to its stem."""
+    return list(map(stem, TOKEN_PATTERN.findall(text)))
+
+
+def bit_indices(bits: int) -> Iterator[int]:
+    """Yield the positions of the bits set in a bitmask, lowest first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class AhoCorasickMatcher:
+    """
+    Aho-Corasick automaton over groups of keywords.
+
+    Each group (e.g. 'greeting' or 'math') is assigned one bit, and searching a
+    text returns the bitmask of every group with at least one keyword occurring
+    as a substring of the text - the same result as running `keyword in text`
+    for each keyword, but in time proportional to the length of the text.
+    """
+    
+    def __init__(self, keyword_groups: Dict[str, List[str]]):
+        """Compile the automaton from a mapping of group name to keywords."""
+        self.groups = list(keyword_groups)
+        self.group_bits = {group: 1 << index for index, group in enumerate(self.groups)}
+        
+        # Trie of all keywords: goto edges, the groups ending at each state
+        # (as a bitmask) and the group index of each keyword ending there
+        goto: List[Dict[str, int]] = [{}]
+        output = [0]
+        ending: List[List[int]] = [[]]
+        for index, (group, keywords) in enumerate(keyword_groups.items()):
+            bit = self.group_bits[group]
+            for keyword in keywords:
+                state = 0
+                for char in keyword:
+                    if char not in goto[state]:
+                        goto.append({})
+                        output.append(0)
+                        ending.append([])
+                        goto[state][char] = len(goto) - 1
+                    state = goto[state][char]
+                if not output[state] & bit:
+                    ending[state].append(index)
+                output[state] |= bit
+        
+        # Breadth-first pass: resolve failure links into a full transition
+        # table so the search loop never has to follow them at runtime
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            ending[state] = ending[state] + ending[fail[state]]
+            for char, target in delta[fail[state]].items():
+                delta[state].setdefault(char, target)
+            for char, target in goto[state].items():
+                fail[target] = delta[fail[state]].get(char, 0)
+                queue.append(target)
+        
+        self._delta = delta
+        self._output = output
+        self._ending = [tuple(indices) for indices in ending]
+    
+    def search(self, text: str, stop: int = 0) -> int:
+        """
+        Return the bitmask of keyword groups found anywhere in the text.
+        Once any group in the `stop` bitmask has been found, the rest of a
+        long text may be skipped, and later groups may be missing.
+        """
+        delta = self._delta
+        output = self._output
+        state = 0
+        hits = 0
+        if not stop or len(text) <= SEARCH_CHUNK:
+            for char in text:
+                state = delta[state].get(char, 0)
+                hits |= output[state]
+            return hits
+        for start in range(0, len(text), SEARCH_CHUNK):
+            for char in text[start:start + SEARCH_CHUNK]:
+                state = delta[state].get(char, 0)
+                hits |= output[state]
+            if hits & stop:
+                break
+        return hits
+    
+    def count(self, text: str) -> List[int]:
+        """Return, per group, how many keyword occurrences the text contains."""
+        delta = self._delta
+        ending = self._ending
+        counts = [0] * len(self.groups)
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            for index in ending[state]:
+                counts[index] += 1
+        return counts
+    
+    def groups_in(self, hits: int) -> List[str]:
+        """Return the names of the groups set in a bitmask, in group order."""
+        return [group for group in self.groups if hits & self.group_bits[group]]
+
+
+class TokenMatcher:
+    """
+    Inverted index from words to keyword groups.
+
+    Keywords only match as whole words ("hi" no longer matches inside "this"),
+    and multi-word keywords such as "how long" only match as consecutive
+    words. Each keyword is indexed under its first word, so searching costs
+    one dict lookup per token of the text, plus a short comparison for the
+    rare tokens that start a phrase.
+    """
+    
+    # How keywords and texts are split into the words that are compared
+    split = staticmethod(tokenize)
+    
+    def __init__(self, keyword_groups: Dict[str, List[str]]):
+        """Build the index from a mapping of group name to keywords."""
+        self.groups = list(keyword_groups)
+        self.group_bits = {group: 1 << index for index, group in enumerate(self.groups)}
+        
+        # first word -> [bits of single-word keywords, [(remaining words, bits), ...],
+        #                [group index of each single-word keyword]]
+        index: Dict[str, list] = {}
+        for position, (group, keywords) in enumerate(keyword_groups.items()):
+            bit = self.group_bits[group]
+            for keyword in keywords:
+                words = self.split(keyword)
+                if not words:
+                    continue
+                entry = index.setdefault(words[0], [0, [], []])
+                if len(words) == 1:
+                    if not entry[0] & bit:
+                        entry[2].append(position)
+                    entry[0] |= bit
+                else:
+                    entry[1].append((words[1:], bit))
+        self._index = index
+    
+    def search(self, text: str, stop: int = 0) -> int:
+        """
+        Return the bitmask of keyword groups whose words appear in the text.
+        Once any group in the `stop` bitmask has been found, the remaining
+        tokens are skipped.
+        """
+        tokens = self.split(text)
+        hits = 0
+        for position, entry in enumerate(map(self._index.get, tokens)):
+            if entry is None:
+                continue
+            hits |= entry[0]
+            for rest, bit in entry[1]:
+                if tokens[position + 1:position + 1 + len(rest)] == rest:
+                    hits |= bit
+            if hits & stop:
+                break
+        return hits
+    
+    def count(self, text: str) -> List[int]:
+        """Return, per group, how many keyword occurrences the text contains."""
+        tokens = self.split(text)
+        counts = [0] * len(self.groups)
+        for position, entry in enumerate(map(self._index.get, tokens)):
+            if entry is None:
+                continue
+            for index in entry[2]:
+                counts[index] += 1
+            for rest, bit in entry[1]:
+                if tokens[position + 1:position + 1 + len(rest)] == rest:
+                    counts[bit.bit_length() - 1] += 1
+        return counts
+    
+    def groups_in(self, hits: int) -> List[str]:
+        """Return the names of the groups set in a bitmask, in group order."""
+        return [group for group in self.groups if hits & self.group_bits[group]]
+
+
+class StemMatcher(TokenMatcher):
+    """
+    Token index over word stems: keywords and query words are both stemmed,
+    so a keyword also matches its inflections ("procrastinate" matches
+    "procrastinating", "exam" matches "exams"). Stems are memoized, so the
+    only extra cost per query is a cache lookup per word.
+    """
+    
+    split = staticmethod(stem_words)
+
+
+# Typo tolerance: shorter words are never corrected, since too many real words
+# are one edit away from a short keyword ("coming" / "coding", "waiting" /
+# "writing"), and only long words may be two edits off ("procastinaet"), as
+# a word of ten letters is two edits from another one too ("hysterical" /
+# "historical"). Typos rarely hit the first letter, so a correction must keep it.
+FUZZY_MIN_LENGTH = 8
+FUZZY_TWO_EDITS_LENGTH = 12
+
+# Misspellings repeat across students, so corrections of recent words are kept
+FUZZY_CACHE_SIZE = 4096
+
+
+def edit_distance(source: str, target: str, limit: int) -> int:
+    """
+    Optimal string alignment distance: insertions, deletions, substitutions
+    and transpositions of adjacent characters each cost one edit. Gives up
+    and returns limit + 1 as soon as the distance is known to exceed limit.
+    """
+    # Typos are local, so only the differing middle of the words needs aligning
+    start = 0
+    while start < len(source) and start < len(target) and source[start] == target[start]:
+        start += 1
+    end = 0
+    while (end < len(source) - start and end < len(target) - start
+           and source[-1 - end] == target[-1 - end]):
+        end += 1
+    source = source[start:len(source) - end]
+    target = target[start:len(target) - end]
+    if abs(len(source) - len(target)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [i] + [0] * len(target)
+        for j, target_char in enumerate(target, 1):
+            cost = source_char != target_char
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and j > 1 and source_char == target[j - 2]
+                    and source[i - 2] == target_char):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """Every string obtained by deleting up to max_distance characters of word."""
+    variants = {word}
+    # (variant, first position still allowed to be deleted), so that each set
+    # of deleted positions is generated once, in increasing order
+    frontier = [(word, 0)]
+    for _ in range(max_distance):
+        frontier = [(variant[:index] + variant[index + 1:], index)
+                    for variant, start in frontier for index in range(start, len(variant))]
+        variants.update(variant for variant, _ in frontier)
+    return variants
+
+
+class FuzzyIndex:
+    """
+    Symmetric-delete (SymSpell) index of single-word keywords.
+
+    Every keyword is stored under each string obtained by deleting up to two
+    of its characters. A misspelled word generates its own deletes, so the
+    keywords it may be a typo of are found with a few dict lookups, and only
+    those few candidates that start with the same letter are checked with an
+    edit distance.
+    """
+    
+    def __init__(self, keyword_groups: Dict[str, List[str]], min_length: int = FUZZY_MIN_LENGTH,
+                 two_edits_length: int = FUZZY_TWO_EDITS_LENGTH):
+        """Index every single-word keyword of at least `min_length` characters."""
+        self.min_length = min_length
+        self.two_edits_length = two_edits_length
+        
+        # keyword -> bits of its groups
+        self.vocabulary: Dict[str, int] = {}
+        for index, keywords in enumerate(keyword_groups.values()):
+            for keyword in keywords:
+                words = tokenize(keyword)
+                if len(words) == 1 and len(words[0]) >= min_length:
+                    self.vocabulary[words[0]] = self.vocabulary.get(words[0], 0) | (1 << index)
+        
+        # delete variant -> keywords it was derived from
+        self._deletes: Dict[str, List[str]] = {}
+        for keyword in self.vocabulary:
+            for variant in deletes(keyword, self.max_distance(len(keyword) + 2)):
+                self._deletes.setdefault(variant, []).append(keyword)
+    
+    def max_distance(self, length: int) -> int:
+        """Number of edits tolerated in a word of the given length."""
+        if length < self.min_length:
+            return 0
+        return 1 if length < self.two_edits_length else 2
+    
+    def lookup(self, word: str) -> int:
+        """Return the bitmask of groups with a keyword within reach of a (misspelled) word."""
+        bits = self.vocabulary.get(word)
+        if bits is not None:
+            return bits
+        limit = self.max_distance(len(word))
+        if not limit:
+            return 0
+        bits = 0
+        candidates = self._deletes
+        checked = set()
+        for variant in deletes(word, limit):
+            for keyword in candidates.get(variant, ()):
+                if keyword not in checked and keyword[0] == word[0]:
+                    checked.add(keyword)
+                    if edit_distance(word, keyword, limit) <= limit:
+                        bits |= self.vocabulary[keyword]
+        return bits
+
+
+class FuzzyMatcher:
+    """
+    Wraps an exact matcher with typo tolerance. The exact matcher runs first;
+    only words it cannot know (long enough to correct and not a keyword
+    themselves) are looked up in the fuzzy index, and the most recent
+    lookups are cached.
+    """
+    
+    def __init__(self, matcher, index: FuzzyIndex, cache_size: int = FUZZY_CACHE_SIZE):
+        self.matcher = matcher
+        self.index = index
+        self.lookup = lru_cache(maxsize=cache_size)(index.lookup)
+        self.groups = matcher.groups
+        self.group_bits = matcher.group_bits
+    
+    def search(self, text: str, stop: int = 0) -> int:
+        """Return the bitmask of keyword groups found exactly or within a few typos."""
+        hits = self.matcher.search(text, stop)
+        if hits & stop:
+            return hits
+        lookup = self.lookup
+        min_length = self.index.min_length
+        vocabulary = self.index.vocabulary
+        for token in tokenize(text):
+            if len(token) >= min_length and token not in vocabulary:
+                hits |= lookup(token)
+        return hits
+    
+    def count(self, text: str) -> List[int]:
+        """Return, per group, how many keyword occurrences (or misspellings of one) the text contains."""
+        counts = self.matcher.count(text)
+        lookup = self.lookup
+        min_length = self.index.min_length
+        vocabulary = self.index.vocabulary
+        for token in tokenize(text):
+            if len(token) >= min_length and token not in vocabulary:
+                for index in bit_indices(lookup(token)):
+                    counts[index] += 1
+        return counts
+    
+    def groups_in(self, hits: int) -> List[str]:
+        """Return the names of the groups set in a bitmask, in group order."""
+        return self.matcher.groups_in(hits)
+
+
+# Keyword matching strategies: 'substring' finds keywords anywhere in the text
+# (the original behaviour), 'token' only matches whole words and phrases, and
+# 'stem' matches whole words and phrases in any inflection
+MATCHERS = {
+    'substring': AhoCorasickMatcher,
+    'token': TokenMatcher,
+    'stem': StemMatcher,
+}
@@ -0,0 +1,53 @@
+"""
+Stemmer
+=======
+A small suffix-stripping stemmer, so that one keyword covers its inflections
+("procrastinate", "procrastinating" and "procrastination" all stem to
+"procrastinat"). It is deliberately simpler than a full Porter stemmer: it
+only has to map the words students use onto the same stems as the keywords.
+"""
+
+from functools import lru_cache
+
+# Student vocabulary is very skewed, so a few thousand stems cover most queries
+STEM_CACHE_SIZE = 8192
+
+# Stems are never shortened below this many letters ("being" stays "being")
+MIN_STEM_LENGTH = 3
+
+# (suffix, replacement), tried in order; the first suffix that leaves a long
+# enough stem is replaced
+SUFFIXES = (
+    ('ies', 'y'),
+    ('ied', 'y'),
+    ('ing', ''),
+    ('ed', ''),
+    ('ion', ''),
+    ('ness', ''),
+    ('ment', ''),
+    ('ly', ''),
+    ('s', ''),
+)
+
+# A final 's' is part of the word after these letters ("class", "calculus", "analysis")
+KEEP_FINAL_S = ('s', 'u', 'i')
+
+# Doubled final consonants that are undoubled once a suffix is gone ("planning" -> "plan")
+UNDOUBLE = frozenset('bdfgkmnprtz')
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+    """Return the stem of a lowercase word."""
+    for suffix, replacement in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            if suffix == 's' and word[-2] in KEEP_FINAL_S:
+                continue
+            word = word[:len(word) - len(suffix)] + replacement
+            break
+    if word.endswith('e') and len(word) > MIN_STEM_LENGTH:
+        word = word[:-1]
+    if len(word) > MIN_STEM_LENGTH and word[-1] == word[-2] and word[-1] in UNDOUBLE:
+        word = word[:-1]
+    return word
+
@@ -6,7 +6,95 @@ It uses pattern matching and conditional logic to provide personalized responses
 """
 
 import re
-from typing import List, Dict, Tuple
+import time
+from itertools import islice
+from typing import List, Dict, Tuple, NamedTuple, Optional, Iterable, Iterator
+
+from instrumentation import QueryStats
+from keyword_matcher import MATCHERS, FuzzyMatcher
+from normalizer import normalize
+from responses import Response, ResponseCatalog
+from rule_loader import DEFAULT_CONFIDENCE_THRESHOLD, INTENTS, CompositeTable, Ranked, RuleSet, load_rule_set
+from sessions import DEFAULT_HISTORY_TURNS, ConversationHistory
+from query_cache import DEFAULT_CACHE_SIZE, QueryCache
+
+# Each intent owns a fixed bit of the classification bitmask (see rule_loader.INTENTS)
+GREETING, EXAM, TIME, MOTIVATION, METHOD, HELP = (1 << index for index in range(len(INTENTS)))
+INTENT_MASK = (1 << len(INTENTS)) - 1
+
+# Longer queries are essays rather than repeated questions, so they are not cached
+MAX_CACHED_QUERY_LENGTH = 256
+
+# Number of queries process_queries reads and deduplicates at a time
+DEFAULT_BATCH_SIZE = 4096
+
+# Longest query answered, in characters; pasted essays beyond this are rejected
+DEFAULT_MAX_INPUT_LENGTH = 10000
+
+# Given instead of an answer to a query longer than max_input_length
+TOO_LONG_RESPONSE = "Your message is too long. Please keep it under {limit} characters."
+
+
+class InputTooLongError(ValueError):
+    """Raised when a query exceeds the assistant's max_input_length."""
+
+
+class Classification(NamedTuple):
+    """Every intent and subject found in a query by a single matcher pass."""
+    hits: int
+    subject: Optional[str]
+
+
+class Answer(NamedTuple):
+    """
+    What the assistant answers to a query: the rule that fired, its category,
+    the subject and the response, with the catalog the response's ID belongs
+    to (the rules may be swapped before the turn is recorded). The subject is
+    None when the answer does not depend on it (a greeting), since matching
+    stops before looking for one.
+    """
+    rule: int
+    category: str
+    subject: Optional[str]
+    response: Response
+    catalog: Optional[ResponseCatalog] = None
+
+
+class ActiveRules:
+    """
+    Everything a query is answered with: a rule set, its matcher for one match
+    mode (optionally typo-tolerant), its decision table (optionally with
+    composite responses) and a classification cache of its own. The assistant publishes a new
+    ActiveRules with a single assignment, so a query that started on one rule
+    set finishes on it even if the rules are swapped meanwhile.
+    """
+    __slots__ = ('rules', 'matcher', 'subjects', 'decision_table', 'query_cache', 'stop')
+    
+    def __init__(self, rules: RuleSet, match_mode: str, cache_size: int, fuzzy: bool = False,
+                 compose: bool = False):
+        self.rules = rules
+        self.matcher = rules.matchers[match_mode]
+        if fuzzy:
+            self.matcher = FuzzyMatcher(self.matcher, rules.fuzzy_index)
+        self.subjects = rules.subjects
+        self.decision_table = CompositeTable(rules) if compose else rules.decision_table
+        # Composite responses depend on every intent, so they never stop early
+        self.stop = 0 if compose else rules.decisive_bits
+        self.query_cache = QueryCache(cache_size) if cache_size else None
+    
+    def classify(self, normalized_input: str) -> Classification:
+        """
+        Classify normalized text with this rule set, bypassing the cache.
+        Matching stops early once an intent that decides the answer is
+        found, so the hits of long texts may omit groups that don't matter.
+        Whether a subject was found by then depends on the match mode and
+        the text's length, so a decided query never reports one.
+        """
+        hits = self.matcher.search(normalized_input, self.stop)
+        if hits & self.stop:
+            return Classification(hits, None)
+        subject_hits = hits >> len(INTENTS)
+        return Classification(hits, self.subjects[(subject_hits & -subject_hits).bit_length()])
 
 
 class StudyAssistant:
@@ -14,30 +102,80 @@ class StudyAssistant:
     A rule-based AI system that provides study advice based on user inputs.
     """
     
-    def __init__(self):
-        """Initialize the Study Assistant with predefined rules and responses."""
-        self.name = "StudyBot"
-        self.conversation_history = []
-        
-        # Define keywords for different categories
-        self.subject_keywords = {
-            'math': ['math', 'mathematics', 'algebra', 'calculus', 'geometry', 'statistics'],
-            'science': ['science', 'physics', 'chemistry', 'biology', 'experiment'],
-            'language': ['english', 'language', 'grammar', 'writing', 'essay', 'vocabulary'],
-            'history': ['history', 'historical', 'past', 'ancient', 'civilization'],
-            'programming': ['programming', 'code', 'coding', 'python', 'java', 'javascript', 'algorithm']
-        }
-        
-        self.time_keywords = ['time', 'schedule', 'when', 'how long', 'duration', 'hours']
-        self.motivation_keywords = ['motivated', 'motivation', 'tired', 'lazy', 'procrastinate', 'difficult', 'hard']
-        self.exam_keywords = ['exam', 'test', 'quiz', 'exam preparation', 'study for exam']
-        self.method_keywords = ['how to study', 'study method', 'technique', 'strategy', 'approach', 'way']
-        self.greeting_keywords = ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon']
-        self.help_keywords = ['help', 'what can you do', 'capabilities', 'assist']
-        
+    def __init__(self, max_history: int = DEFAULT_HISTORY_TURNS, cache_size: int = DEFAULT_CACHE_SIZE,
+                 match_mode: str = 'substring', rules: RuleSet = None, fuzzy: bool = False,
+                 compose: bool = False, max_input_length: int = DEFAULT_MAX_INPUT_LENGTH,
+                 instrument: bool = False):
+        """
+        Initialize the Study Assistant with predefined rules and responses.
+        Only the last `max_history` turns of the conversation are kept, and up
+        to `cache_size` query classifications are memoized (0 disables caching).
+        `match_mode` selects how keywords are matched (see MATCHERS), `fuzzy`
+        also accepts misspelled keywords ("mathmatics"), `compose` answers
+        every intent of a query in one composite response instead of only
+        the first rule that fires, `rules` defaults to the compiled contents
+        of rules.json, queries longer than `max_input_length` characters
+        raise InputTooLongError, and `instrument` counts rule hits and times
+        every stage of respond() (see stats()).
+        """
+        if match_mode not in MATCHERS:
+            raise ValueError(f"Unknown match mode {match_mode!r}, expected one of {', '.join(MATCHERS)}")
+        self.match_mode = match_mode
+        self.cache_size = cache_size
+        self.fuzzy = fuzzy
+        self.compose = compose
+        self.max_input_length = max_input_length
+        self.use_rules(rules if rules is not None else load_rule_set())
+        self.instrumentation = QueryStats(len(self.rules.categories)) if instrument else None
+        self.conversation_history = ConversationHistory(max_history, self.catalog)
+    
+    def use_rules(self, rules: RuleSet):
+        """
+        Switch to a compiled rule set: its keywords, matcher, decision table
+        and responses. Queries pick up the new rules atomically, with a fresh
+        classification cache; queries already running finish on the old ones.
+        The keyword lists are copied onto the assistant so they can be edited
+        and recompiled with compile_rules().
+        """
+        active = ActiveRules(rules, self.match_mode, self.cache_size, self.fuzzy, self.compose)
+        self.active = active
+        self.rules = rules
+        self.name = rules.name
+        self.catalog = rules.catalog
+        self.subject_keywords = {subject: list(keywords) for subject, keywords in rules.subject_keywords.items()}
+        for intent, keywords in rules.intent_keywords.items():
+            setattr(self, f'{intent}_keywords', list(keywords))
+        self.keyword_groups = rules.keyword_groups
+        self.matcher = active.matcher
+        self.group_bits = rules.group_bits
+        self.subjects = rules.subjects
+        self.decision_table = active.decision_table
+        self.query_cache = active.query_cache
+    
+    def compile_rules(self):
+        """
+        Compile the assistant's keyword lists into a new rule set, with one
+        matcher for all keywords and the rule priority as a decision table.
+        Call this after changing any of the keyword lists.
+        """
+        spec = dict(self.rules.spec)
+        spec['intents'] = {intent: list(getattr(self, f'{intent}_keywords')) for intent in INTENTS}
+        spec['subjects'] = {subject: list(keywords) for subject, keywords in self.subject_keywords.items()}
+        self.use_rules(RuleSet(spec))
+    
+    def decision_index(self, hits: int) -> int:
+        """
+        Map a matcher bitmask to its decision table slot. Only the first subject
+        matters to the rules, so the slot is the intent bits plus the position
+        of the lowest subject bit.
+        """
+        subject_hits = hits >> len(INTENTS)
+        subject_index = (subject_hits & -subject_hits).bit_length()
+        return (subject_index << len(INTENTS)) | (hits & INTENT_MASK)
+    
     def normalize_input(self, user_input: str) -> str:
-        """Convert input to lowercase and remove extra spaces."""
-        return ' '.join(user_input.lower().split())
+        """Fold case, compatibility characters and punctuation, and remove extra spaces."""
+        return normalize(user_input)
     
     def check_keywords(self, text: str, keyword_list: List[str]) -> bool:
         """Check if any keyword from the list appears in the text."""
@@ -45,200 +183,210 @@ class StudyAssistant:
     
     def identify_subject(self, text: str) -> str:
         """Identify the subject mentioned in the user's query."""
-        for subject, keywords in self.subject_keywords.items():
-            if self.check_keywords(text, keywords):
-                return subject
-        return None
+        return self.subject_from_hits(self.active.matcher.search(text))
+    
+    def subject_from_hits(self, hits: int) -> str:
+        """Return the first subject (in definition order) set in a matcher bitmask."""
+        subject_hits = hits >> len(INTENTS)
+        return self.active.subjects[(subject_hits & -subject_hits).bit_length()]
     
     def get_subject_advice(self, subject: str) -> str:
         """Return study advice specific to a subject."""
-        advice = {
-            'math': (
-                "For Mathematics, I recommend:\n"
-                "• Practice problems daily - math is about repetition\n"
-                "• Understand concepts before memorizing formulas\n"
-                "• Work through examples step-by-step\n"
-                "• Review mistakes and understand why they happened\n"
-                "• Use visual aids like graphs and diagrams when possible"
-            ),
-            'science': (
-                "For Science subjects, I suggest:\n"
-                "• Read the material before class to prepare\n"
-                "• Take detailed notes during lectures\n"
-                "• Create concept maps to connect ideas\n"
-                "• Perform hands-on experiments when possible\n"
-                "• Review diagrams and visual representations regularly"
-            ),
-            'language': (
-                "For Language studies, try:\n"
-                "• Read extensively to improve vocabulary\n"
-                "• Practice writing daily, even just a paragraph\n"
-                "• Use flashcards for vocabulary building\n"
-                "• Engage in conversations or discussions\n"
-                "• Review grammar rules with examples"
-            ),
-            'history': (
-                "For History, I recommend:\n"
-                "• Create timelines to visualize events\n"
-                "• Focus on cause-and-effect relationships\n"
-                "• Use mnemonic devices to remember dates\n"
-                "• Connect historical events to current events\n"
-                "• Summarize each chapter in your own words"
-            ),
-            'programming': (
-                "For Programming, I suggest:\n"
-                "• Code every day, even if just for 30 minutes\n"
-                "• Build projects to apply what you learn\n"
-                "• Read and understand others' code\n"
-                "• Practice problem-solving on coding platforms\n"
-                "• Debug systematically and learn from errors"
-            )
-        }
-        return advice.get(subject, "I can help with study strategies for any subject!")
+        return self.catalog.get(f'subject:{subject}', self.catalog.by_key('subject')).text
     
     def get_time_management_advice(self) -> str:
         """Provide time management and scheduling advice."""
-        return (
-            "For effective time management:\n"
-            "• Use the Pomodoro Technique: 25 minutes study, 5 minutes break\n"
-            "• Create a weekly schedule and stick to it\n"
-            "• Prioritize difficult subjects when you're most alert\n"
-            "• Break large tasks into smaller, manageable chunks\n"
-            "• Review your schedule weekly and adjust as needed\n"
-            "• Aim for 2-3 hours of focused study per day for each major subject"
-        )
+        return self.catalog.by_key('time').text
     
     def get_motivation_advice(self) -> str:
         """Provide motivation and encouragement."""
-        return (
-            "When you're feeling unmotivated:\n"
-            "• Remember your goals and why you started\n"
-            "• Start with just 5 minutes - momentum builds\n"
-            "• Reward yourself after completing study sessions\n"
-            "• Study with a friend or join a study group\n"
-            "• Take care of your physical health: sleep, exercise, nutrition\n"
-            "• Break tasks into smaller steps to avoid feeling overwhelmed\n"
-            "• Remember: progress, not perfection!"
-        )
+        return self.catalog.by_key('motivation').text
     
     def get_exam_preparation_advice(self) -> str:
         """Provide exam preparation strategies."""
-        return (
-            "For exam preparation:\n"
-            "• Start studying at least 2 weeks before the exam\n"
-            "• Create a study schedule covering all topics\n"
-            "• Review past exams and practice questions\n"
-            "• Teach the material to someone else (Feynman Technique)\n"
-            "• Use active recall: test yourself without looking at notes\n"
-            "• Get adequate sleep the night before\n"
-            "• Stay calm and confident - you've prepared for this!"
-        )
+        return self.catalog.by_key('exam').text
     
     def get_study_method_advice(self) -> str:
         """Provide general study methods and techniques."""
-        return (
-            "Effective study methods include:\n"
-            "• Active Recall: Test yourself without looking at notes\n"
-            "• Spaced Repetition: Review material at increasing intervals\n"
-            "• Interleaving: Mix different subjects/topics in one session\n"
-            "• Elaboration: Explain concepts in your own words\n"
-            "• Dual Coding: Combine words with visual representations\n"
-            "• Retrieval Practice: Regularly test your knowledge\n"
-            "• The Feynman Technique: Teach concepts to someone else"
-        )
+        return self.catalog.by_key('method').text
     
     def get_greeting_response(self) -> str:
         """Respond to greetings."""
-        return (
-            f"Hello! I'm {self.name}, your Study Assistant.\n"
-            "I can help you with:\n"
-            "• Subject-specific study tips\n"
-            "• Time management strategies\n"
-            "• Exam preparation advice\n"
-            "• Study methods and techniques\n"
-            "• Motivation and encouragement\n\n"
-            "What would you like help with today?"
-        )
+        return self.catalog.by_key('greeting').text
     
     def get_help_response(self) -> str:
         """Provide help information."""
-        return (
-            "I can assist you with various study-related topics:\n\n"
-            "Subject Help: Ask about studying math, science, language, history, or programming\n"
-            "Time Management: Ask about schedules, study duration, or time planning\n"
-            "Motivation: Share if you're feeling unmotivated or struggling\n"
-            "Exam Prep: Get advice on preparing for exams and tests\n"
-            "Study Methods: Learn about effective study techniques\n\n"
-            "Just ask me a question in natural language, and I'll help!"
-        )
-    
-    def process_query(self, user_input: str) -> str:
+        return self.catalog.by_key('help').text
+    
+    def get_default_response(self) -> str:
+        """Respond to queries that no rule recognizes."""
+        return self.catalog.by_key('default').text
+    
+    def classify(self, user_input: str, active: ActiveRules = None) -> Classification:
+        """
+        Find every intent and subject in the user's query in one pass.
+        The result is all the rules need, so they never rescan the text.
+        Results are memoized by normalized text when caching is enabled.
+        `active` pins the rules to classify with (by default the current ones).
+        """
+        if active is None:
+            active = self.active
+        return self.classify_cached(self.normalize_input(user_input), active)
+    
+    def classify_cached(self, normalized_input: str, active: ActiveRules) -> Classification:
+        """Classify normalized text with `active`, through its query cache when enabled."""
+        cache = active.query_cache
+        if cache is None or len(normalized_input) > MAX_CACHED_QUERY_LENGTH:
+            return active.classify(normalized_input)
+        return cache.get_or_compute(normalized_input, active.classify)
+    
+    def classify_normalized(self, normalized_input: str) -> Classification:
+        """Classify text that has already been through normalize_input, bypassing the cache."""
+        return self.active.classify(normalized_input)
+    
+    def apply_rules(self, classification: Classification) -> int:
+        """
+        Return the number of the first rule that fires for a classified query.
+        Rules follow the priority in rules.json: 1 greeting, 2 exam (plus
+        subject advice), 3 subject, 4 time, 5 motivation, 6 method, 7 help and
+        8 the default response.
+        """
+        return self.rules.apply_rules(classification.hits, classification.subject)
+    
+    def rank_intents(self, user_input: str, threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[Ranked]:
+        """
+        Rank every category the query mentions by weighted keyword count,
+        with confidences, instead of stopping at the first rule that fires
+        ("I'm tired and lazy before my exam" ranks motivation above exam).
+        Equal scores keep the rule priority order.
+        """
+        active = self.active
+        return active.rules.rank(active.matcher.count(self.normalize_input(user_input)), threshold)
+    
+    def get_rule_response(self, rule: int, subject: Optional[str] = None) -> Response:
+        """Look up the catalog response for a rule number and the subject of the query."""
+        return self.rules.rule_response(rule, subject)
+    
+    def respond(self, user_input: str) -> Answer:
+        """
+        Answer a query without side effects: nothing is recorded, and the only
+        shared state read is the current rule set (and, when enabled, the
+        internally locked query cache). Safe to call from any number of
+        threads at once; record the turn separately with record().
+        Raises InputTooLongError for queries longer than max_input_length.
+        """
+        if len(user_input) > self.max_input_length:
+            raise InputTooLongError(
+                f"Query is {len(user_input)} characters long; the limit is {self.max_input_length}"
+            )
+        active = self.active
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            return self._respond_timed(user_input, active, instrumentation)
+        classification = self.classify(user_input, active)
+        decision = active.decision_table[self.decision_index(classification.hits)]
+        return Answer(decision.rule, active.rules.categories[decision.rule - 1],
+                      classification.subject, decision.response, active.rules.catalog)
+    
+    def _respond_timed(self, user_input: str, active: ActiveRules, instrumentation: QueryStats) -> Answer:
+        """respond() with each stage timed and the rule that fired counted."""
+        clock = time.perf_counter
+        started = clock()
+        normalized_input = self.normalize_input(user_input)
+        normalized = clock()
+        classification = self.classify_cached(normalized_input, active)
+        matched = clock()
+        decision = active.decision_table[self.decision_index(classification.hits)]
+        answer = Answer(decision.rule, active.rules.categories[decision.rule - 1],
+                        classification.subject, decision.response, active.rules.catalog)
+        selected = clock()
+        instrumentation.record(decision.rule, normalized - started, matched - normalized, selected - matched)
+        return answer
+    
+    def stats(self) -> Dict:
+        """
+        Return what the assistant has answered since it started: hits per
+        rule, default (rule 8) fallbacks and time spent normalizing, matching
+        and selecting responses, plus the query cache counters. Rule hits and
+        timings are only collected when the assistant was created with
+        instrument=True; process_queries() is never counted.
+        """
+        active = self.active
+        cache = active.query_cache
+        if self.instrumentation is None:
+            stats = {'enabled': False}
+        else:
+            stats = {'enabled': True, **self.instrumentation.snapshot(active.rules.categories)}
+        stats['cache'] = cache.stats() if cache is not None else None
+        return stats
+    
+    def too_long_response(self) -> str:
+        """Return the message given instead of an answer to a query longer than max_input_length."""
+        return TOO_LONG_RESPONSE.format(limit=self.max_input_length)
+    
+    def record(self, user_input: str, answer: Answer, history: ConversationHistory = None):
+        """
+        Record a turn in `history` if given (e.g. a per-session history),
+        otherwise in the assistant's own conversation_history. Histories lock
+        while recording, so concurrent turns of one conversation never race.
+        The turn keeps the catalog it was answered from, so it reads the same
+        after the rules are reloaded.
+        """
+        if history is None:
+            history = self.conversation_history
+        history.record(user_input, answer.response.id, answer.catalog)
+    
+    def process_query(self, user_input: str, history: ConversationHistory = None) -> str:
         """
         Main processing function that applies rules to determine the response.
         This is the core rule-based logic of the AI system.
+        The turn is recorded in `history` if given (e.g. a per-session history),
+        otherwise in the assistant's own conversation_history.
         """
-        normalized_input = self.normalize_input(user_input)
-        self.conversation_history.append(("user", user_input))
-        
-        # Rule 1: Check for greetings
-        if self.check_keywords(normalized_input, self.greeting_keywords):
-            response = self.get_greeting_response()
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 2: Check for exam-related queries
-        if self.check_keywords(normalized_input, self.exam_keywords):
-            subject = self.identify_subject(normalized_input)
-            response = self.get_exam_preparation_advice()
-            if subject:
-                response += f"\n\n{self.get_subject_advice(subject)}"
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 3: Check for subject-specific queries (before generic help)
-        subject = self.identify_subject(normalized_input)
-        if subject:
-            response = self.get_subject_advice(subject)
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 4: Check for time management queries
-        if self.check_keywords(normalized_input, self.time_keywords):
-            response = self.get_time_management_advice()
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 5: Check for motivation-related queries
-        if self.check_keywords(normalized_input, self.motivation_keywords):
-            response = self.get_motivation_advice()
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 6: Check for study method queries
-        if self.check_keywords(normalized_input, self.method_keywords):
-            response = self.get_study_method_advice()
-            self.conversation_history.append(("assistant", response))
-            return response
-        
-        # Rule 7: Check for help requests (after checking for specific topics)
-        if self.check_keywords(normalized_input, self.help_keywords):
-            response = self.get_help_response()
-            self.conversation_history.append(("assistant", response))
-            return response
+        answer = self.respond(user_input)
+        self.record(user_input, answer, history)
+        return answer.response.text
+    
+    def process_queries(self, queries: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+        """
+        Answer many queries, yielding one response per query in input order.
+        Nothing is recorded in any conversation history. Queries are consumed
+        lazily, `batch_size` at a time, and repeats within a batch are
+        normalized and matched only once, so arbitrarily long streams run in
+        bounded memory without touching the shared query cache.
+        A query longer than max_input_length is answered with
+        too_long_response() instead of raising, so one pasted essay cannot
+        end the stream.
+        """
+        active = self.active
+        normalize = self.normalize_input
+        search = active.matcher.search
+        stop = active.stop
+        decision_index = self.decision_index
+        table = active.decision_table
+        max_input_length = self.max_input_length
+        too_long = self.too_long_response()
         
-        # Rule 8: Default response for unrecognized queries
-        response = (
-            "I understand you're asking about studying, but I'm not sure I caught that.\n"
-            "Could you try rephrasing? I can help with:\n"
-            "• Study tips for specific subjects (math, science, language, history, programming)\n"
-            "• Time management and scheduling\n"
-            "• Exam preparation\n"
-            "• Study methods and techniques\n"
-            "• Motivation and encouragement\n\n"
-            "Or type 'help' to see what I can do!"
-        )
-        self.conversation_history.append(("assistant", response))
-        return response
+        queries = iter(queries)
+        while True:
+            batch = list(islice(queries, batch_size))
+            if not batch:
+                return
+            by_query = {}
+            by_normalized = {}
+            for query in batch:
+                response = by_query.get(query)
+                if response is None:
+                    if len(query) > max_input_length:
+                        yield too_long
+                        continue
+                    normalized_input = normalize(query)
+                    response = by_normalized.get(normalized_input)
+                    if response is None:
+                        response = table[decision_index(search(normalized_input, stop))].response.text
+                        by_normalized[normalized_input] = response
+                    by_query[query] = response
+                yield response
     
     def chat(self):
         """Interactive chat interface for the Study Assistant."""
@@ -257,7 +405,10 @@ class StudyAssistant:
             if not user_input:
                 continue
             
-            response = self.process_query(user_input)
+            try:
+                response = self.process_query(user_input)
+            except InputTooLongError:
+                response = self.too_long_response()
             print(f"\n{self.name}: {response}\n")
             print("-" * 60)
 
@@ -0,0 +1,177 @@
+"""
+Batch Classifier
+================
+Optional NumPy engine for classifying very large batches of queries,
+such as replays of logged traffic. NumPy is not needed by the web app;
+install it separately to use this module.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate, islice
+from typing import Iterable, Iterator, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from study_assistant import INTENTS, INTENT_MASK, StudyAssistant
+
+DEFAULT_BATCH_SIZE = 65536
+
+
+class NumpyBatchClassifier:
+    """
+    Classifies whole batches of queries with array operations.
+
+    The batch is packed into one byte buffer and every position is read as a
+    little-endian 8-byte word. A 65,536-entry table of keyword bigrams picks
+    out the few positions where some keyword could start, and only those are
+    compared against the keywords (up to 16 bytes as one or two words), so the
+    work per character is a handful of vectorized operations no matter how
+    many keywords there are. Keyword hits are folded into categories through
+    the keyword x category incidence matrix and turned into decision table
+    slots, so the responses follow exactly the same rule priority and
+    substring semantics as StudyAssistant.process_query.
+    """
+    
+    def __init__(self, assistant: StudyAssistant):
+        """Compile the incidence matrix and keyword tables from an assistant's rules."""
+        if np is None:
+            raise ImportError("NumpyBatchClassifier requires NumPy: pip install numpy")
+        if assistant.match_mode != 'substring':
+            raise ValueError("NumpyBatchClassifier only supports the 'substring' match mode")
+        if assistant.fuzzy or assistant.compose:
+            raise ValueError("NumpyBatchClassifier does not support fuzzy matching or composite responses")
+        self.assistant = assistant
+        
+        groups = list(assistant.keyword_groups)
+        self.keywords: List[str] = []
+        keyword_index = {}
+        incidence_rows = []
+        for column, group in enumerate(groups):
+            for keyword in assistant.keyword_groups[group]:
+                if keyword not in keyword_index:
+                    keyword_index[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    incidence_rows.append([0] * len(groups))
+                incidence_rows[keyword_index[keyword]][column] = 1
+        self.incidence = np.array(incidence_rows, dtype=np.int64).reshape(len(self.keywords), len(groups))
+        self.group_bits = np.array([assistant.group_bits[group] for group in groups], dtype=np.int64)
+        self.keyword_bits = self.incidence @ self.group_bits
+        self.response_ids = np.array(
+            [decision.response.id for decision in assistant.decision_table], dtype=np.int32
+        )
+        
+        # Keywords of 2-16 bytes are matched word-wise, grouped by their first two bytes;
+        # any others are found with str.find over the joined batch
+        self.bigram_table = np.zeros(1 << 16, dtype=bool)
+        self.by_bigram = {}
+        self.other_keywords = []
+        for index, keyword in enumerate(self.keywords):
+            encoded = keyword.encode('utf-8')
+            if not 2 <= len(encoded) <= 16:
+                self.other_keywords.append(index)
+                continue
+            head = int.from_bytes(encoded[:8].ljust(8, b'\0'), 'little')
+            tail = int.from_bytes(encoded[-8:], 'little') if len(encoded) > 8 else None
+            head_mask = (1 << (8 * min(len(encoded), 8))) - 1
+            bigram = head & 0xFFFF
+            self.bigram_table[bigram] = True
+            self.by_bigram.setdefault(bigram, []).append(
+                (np.uint64(head), np.uint64(head_mask), len(encoded), tail and np.uint64(tail), index)
+            )
+    
+    def classify(self, normalized_inputs: Sequence[str]) -> "np.ndarray":
+        """Return the matcher bitmask of each already-normalized query."""
+        count = len(normalized_inputs)
+        hits = np.zeros(count, dtype=np.int64)
+        if not count:
+            return hits
+        # Queries are separated by NUL bytes, which no keyword contains, so
+        # a window that crosses from one query into the next never matches
+        joined = '\0'.join(normalized_inputs)
+        data = joined.encode('utf-8')
+        if len(data) == len(joined):
+            lengths = np.fromiter(map(len, normalized_inputs), dtype=np.int64, count=count) + 1
+        else:
+            encoded = [text.encode('utf-8') for text in normalized_inputs]
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=count) + 1
+        starts = np.cumsum(lengths) - lengths
+        size = len(data)
+        padded = data + b'\0' * 32
+        words = np.empty(size + 8, dtype=np.uint64)
+        for offset in range(8):
+            words[offset::8] = np.frombuffer(
+                padded, dtype='<u8', count=len(words[offset::8]), offset=offset
+            )
+        
+        bigrams = (words[:size] & np.uint64(0xFFFF)).astype(np.uint16)
+        candidates = np.flatnonzero(self.bigram_table[bigrams])
+        candidate_bigrams = bigrams[candidates]
+        order = np.argsort(candidate_bigrams, kind='stable')
+        candidates = candidates[order]
+        candidate_bigrams = candidate_bigrams[order]
+        
+        for bigram, keywords in self.by_bigram.items():
+            low, high = np.searchsorted(candidate_bigrams, [bigram, bigram + 1])
+            if low == high:
+                continue
+            positions = candidates[low:high]
+            heads = words[positions]
+            for head, head_mask, length, tail, index in keywords:
+                matched = (heads & head_mask) == head
+                if tail is not None:
+                    matched &= words[positions + (length - 8)] == tail
+                found = positions[matched]
+                if len(found):
+                    owners = np.searchsorted(starts, found, side='right') - 1
+                    np.bitwise_or.at(hits, owners, self.keyword_bits[index])
+        
+        if self.other_keywords:
+            # Searched for in the joined text, skipping to the next query after
+            # each hit, so the work is one pass and no per-query copies are made
+            text_starts = list(accumulate((len(text) + 1 for text in normalized_inputs), initial=0))
+            for index in self.other_keywords:
+                keyword = self.keywords[index]
+                owners = []
+                position = joined.find(keyword)
+                while position >= 0:
+                    owner = bisect_right(text_starts, position) - 1
+                    owners.append(owner)
+                    position = joined.find(keyword, text_starts[owner + 1])
+                hits[owners] |= self.keyword_bits[index]
+        return hits
+    
+    def decision_indices(self, hits: "np.ndarray") -> "np.ndarray":
+        """Vectorized StudyAssistant.decision_index: intent bits plus first subject position."""
+        subject_hits = (hits[:, None] >> np.arange(len(INTENTS), len(self.group_bits))) & 1
+        first_subject = np.where(subject_hits.any(axis=1), subject_hits.argmax(axis=1) + 1, 0)
+        return (first_subject << len(INTENTS)) | (hits & INTENT_MASK)
+    
+    def respond_ids(self, queries: Sequence[str]) -> "np.ndarray":
+        """Return the catalog response ID for each raw query."""
+        normalize = self.assistant.normalize_input
+        hits = self.classify([normalize(query) for query in queries])
+        return self.response_ids[self.decision_indices(hits)]
+    
+    def process_queries(self, queries: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+        """
+        Answer many queries, yielding one response per query in input order,
+        like StudyAssistant.process_queries but `batch_size` queries at a time.
+        Queries longer than the assistant's max_input_length are not classified
+        and get its too_long_response(), as in StudyAssistant.process_queries.
+        """
+        catalog = [decision.response for decision in self.assistant.decision_table]
+        texts = {response.id: response.text for response in catalog}
+        max_input_length = self.assistant.max_input_length
+        too_long = self.assistant.too_long_response()
+        queries = iter(queries)
+        while True:
+            batch = list(islice(queries, batch_size))
+            if not batch:
+                return
+            answerable = [query for query in batch if len(query) <= max_input_length]
+            response_ids = iter(self.respond_ids(answerable).tolist() if answerable else ())
+            for query in batch:
+                yield too_long if len(query) > max_input_length else texts[next(response_ids)]
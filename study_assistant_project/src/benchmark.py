@@ -0,0 +1,259 @@
+"""
+Benchmark Suite for Study Assistant
+===================================
+Measures how fast each engine answers synthetic query corpora and writes
+the results to a JSON file, so runs before and after a change can be
+compared.
+
+Corpora vary in query length, in the share of words that are keywords and
+in how skewed repetition is (a few queries asked over and over, as the
+suggestion chips do, or every query different). For every engine and
+corpus the suite reports throughput, p50/p99 latency per query and the
+peak memory allocated while answering a query.
+
+    python benchmark.py                         # every engine on every corpus
+    python benchmark.py --engines respond,stem --corpora chips --queries 5000
+    python benchmark.py --compare old.json      # also print the change against an earlier run
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from study_assistant import StudyAssistant
+
+DEFAULT_QUERIES = 20000
+DEFAULT_SEED = 1234
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+# Queries traced for memory per engine and corpus; tracing is far slower than answering
+MEMORY_SAMPLE = 500
+
+# Words that are no keyword of any rule, to pad queries with
+FILLER_WORDS = (
+    'the', 'a', 'my', 'i', 'is', 'and', 'to', 'of', 'in', 'for', 'with', 'about', 'this',
+    'that', 'what', 'should', 'could', 'would', 'really', 'week', 'tomorrow', 'teacher',
+    'class', 'homework', 'chapter', 'notes', 'book', 'friend', 'library', 'question',
+    'answer', 'problem', 'today', 'night', 'morning', 'after', 'before', 'school', 'paper',
+)
+
+
+class Corpus(NamedTuple):
+    """How to generate a synthetic query corpus."""
+    words: int            # mean words per query
+    keyword_share: float  # share of words drawn from the rules' keywords
+    distinct: int         # distinct queries the corpus is drawn from
+    skew: float           # Zipf exponent of repetition; 0 repeats every query equally often
+
+
+CORPORA = {
+    # Suggestion-chip traffic: short queries, a handful of them asked over and over
+    'chips': Corpus(words=5, keyword_share=0.4, distinct=50, skew=1.2),
+    # Typical chat: sentence-length queries with moderate repetition
+    'chat': Corpus(words=14, keyword_share=0.15, distinct=5000, skew=0.8),
+    # Every query different, so caches never help
+    'unique': Corpus(words=14, keyword_share=0.15, distinct=10 ** 9, skew=0.0),
+    # No keyword at all, so every query falls through to the default response
+    'miss': Corpus(words=14, keyword_share=0.0, distinct=10 ** 9, skew=0.0),
+    # Pasted paragraphs, longer than the classification cache accepts
+    'essays': Corpus(words=300, keyword_share=0.05, distinct=10 ** 9, skew=0.0),
+}
+
+
+def generate_queries(corpus: Corpus, keywords: List[str], count: int, seed: int) -> List[str]:
+    """Generate `count` queries for a corpus, reproducibly for a given seed."""
+    rng = random.Random(seed)
+    
+    def make_query() -> str:
+        length = max(1, round(rng.gauss(corpus.words, corpus.words / 4)))
+        words = [rng.choice(keywords) if rng.random() < corpus.keyword_share else rng.choice(FILLER_WORDS)
+                 for _ in range(length)]
+        query = ' '.join(words)
+        return query[0].upper() + query[1:] + rng.choice(('', '?', '!', '.'))
+    
+    if corpus.distinct >= count:
+        return [make_query() for _ in range(count)]
+    pool = [make_query() for _ in range(corpus.distinct)]
+    weights = [1 / rank ** corpus.skew for rank in range(1, len(pool) + 1)]
+    return rng.choices(pool, weights, k=count)
+
+
+class Engine(NamedTuple):
+    """A way of answering queries: one at a time, or a whole stream at once."""
+    answer: Optional[Callable[[str], str]]
+    answer_all: Optional[Callable[[Iterable[str]], Iterator[str]]] = None
+
+
+def single(**options) -> Callable[[], Engine]:
+    """An engine answering one query at a time with StudyAssistant.respond."""
+    def build() -> Engine:
+        assistant = StudyAssistant(**options)
+        return Engine(lambda query: assistant.respond(query).response.text)
+    return build
+
+
+def process_query_engine() -> Engine:
+    assistant = StudyAssistant()
+    return Engine(assistant.process_query)
+
+
+def process_queries_engine() -> Engine:
+    return Engine(None, StudyAssistant().process_queries)
+
+
+def numpy_engine() -> Engine:
+    from batch_classifier import NumpyBatchClassifier
+    return Engine(None, NumpyBatchClassifier(StudyAssistant(cache_size=0)).process_queries)
+
+
+ENGINES: Dict[str, Callable[[], Engine]] = {
+    'process_query': process_query_engine,
+    'respond': single(),
+    'respond-uncached': single(cache_size=0),
+    'token': single(match_mode='token'),
+    'stem': single(match_mode='stem'),
+    'fuzzy': single(fuzzy=True),
+    'compose': single(compose=True),
+    'instrumented': single(instrument=True),
+    'process_queries': process_queries_engine,
+    'numpy': numpy_engine,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Return the value below which `fraction` of the sorted values fall."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure(engine: Engine, queries: List[str]) -> Dict:
+    """Answer every query with an engine and return its throughput, latency and memory figures."""
+    if engine.answer is None:
+        list(engine.answer_all(queries[:1000]))  # warm up
+        started = time.perf_counter()
+        for _ in engine.answer_all(queries):
+            pass
+        elapsed = time.perf_counter() - started
+        return {
+            'queries': len(queries),
+            'seconds': elapsed,
+            'queries_per_second': len(queries) / elapsed,
+            'p50_us': None,  # streams answer queries in batches, not one at a time
+            'p99_us': None,
+            'peak_bytes_per_query': None,
+        }
+    
+    answer = engine.answer
+    for query in queries[:1000]:  # warm up caches and lazily built tables
+        answer(query)
+    clock = time.perf_counter_ns
+    latencies = []
+    started = time.perf_counter()
+    for query in queries:
+        before = clock()
+        answer(query)
+        latencies.append(clock() - before)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    
+    # Peak memory allocated while answering, traced on a sample of the queries
+    peaks = 0
+    sample = queries[:MEMORY_SAMPLE]
+    tracemalloc.start()
+    try:
+        for query in sample:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            answer(query)
+            peaks += tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'queries': len(queries),
+        'seconds': elapsed,
+        'queries_per_second': len(queries) / elapsed,
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'peak_bytes_per_query': peaks / len(sample),
+    }
+
+
+def run(engines: List[str], corpora: List[str], count: int, seed: int) -> Dict:
+    """Benchmark every engine on every corpus and return the results with the run's configuration."""
+    keywords = sorted({keyword for group in StudyAssistant().keyword_groups.values() for keyword in group})
+    results = []
+    for corpus_name in corpora:
+        queries = generate_queries(CORPORA[corpus_name], keywords, count, seed)
+        for engine_name in engines:
+            try:
+                engine = ENGINES[engine_name]()
+            except ImportError as error:  # optional engines, e.g. numpy
+                print(f"  skipping {engine_name}: {error}")
+                continue
+            result = {'engine': engine_name, 'corpus': corpus_name, **measure(engine, queries)}
+            results.append(result)
+            print(f"  {engine_name:<17} {corpus_name:<7} {result['queries_per_second']:>12,.0f} q/s"
+                  + (f"  p50 {result['p50_us']:7.1f} us  p99 {result['p99_us']:7.1f} us"
+                     f"  {result['peak_bytes_per_query']:8.0f} B/query" if result['p50_us'] is not None else ''))
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'queries_per_corpus': count,
+        'seed': seed,
+        'corpora': {name: CORPORA[name]._asdict() for name in corpora},
+        'results': results,
+    }
+
+
+def compare(current: Dict, previous: Dict):
+    """Print the throughput change of every engine and corpus measured in both runs."""
+    before = {(result['engine'], result['corpus']): result for result in previous['results']}
+    print(f"\nThroughput against the run of {previous['timestamp']}:")
+    for result in current['results']:
+        old = before.get((result['engine'], result['corpus']))
+        if old is not None:
+            change = result['queries_per_second'] / old['queries_per_second'] - 1
+            print(f"  {result['engine']:<17} {result['corpus']:<7} {change:+7.1%}")
+
+
+def main():
+    """Run the benchmarks selected on the command line and write the results."""
+    parser = argparse.ArgumentParser(description="Benchmark the Study Assistant engines.")
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f"comma-separated engines (default: all of {', '.join(ENGINES)})")
+    parser.add_argument('--corpora', default=','.join(CORPORA),
+                        help=f"comma-separated corpora (default: all of {', '.join(CORPORA)})")
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help="queries per corpus")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="seed of the corpus generator")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON file to write the results to")
+    parser.add_argument('--compare', metavar='RESULTS', help="earlier results file to compare against")
+    args = parser.parse_args()
+    
+    engines = args.engines.split(',')
+    corpora = args.corpora.split(',')
+    for name in engines:
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name!r}")
+    for name in corpora:
+        if name not in CORPORA:
+            parser.error(f"unknown corpus {name!r}")
+    
+    print(f"Benchmarking {len(engines)} engines on {len(corpora)} corpora of {args.queries} queries")
+    results = run(engines, corpora, args.queries, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as previous:
+            compare(results, json.load(previous))
+
+
+if __name__ == "__main__":
+    main()
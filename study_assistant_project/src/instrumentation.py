@@ -0,0 +1,131 @@
+"""
+Query Instrumentation
+=====================
+Low-overhead counters for the Study Assistant: how often each rule fires
+(including the default fallback) and how long each stage of answering a
+query takes - normalization, matching (classification, including cache
+lookups) and response selection.
+
+Every thread accumulates into its own counters, so recording a query takes
+no lock; the counters of all threads are added together only when read.
+"""
+
+import itertools
+import threading
+import weakref
+from typing import Dict, Hashable, Sequence
+
+# Stages of answering a query, in order
+STAGES = ('normalize', 'match', 'select')
+
+
+class _ThreadToken:
+    """Lives exactly as long as its thread's local storage, so its finalizer marks the thread's exit."""
+    __slots__ = ('__weakref__',)
+
+
+class ThreadTally:
+    """
+    Numbers keyed by any hashable, added to by many threads without locking.
+    Each thread updates a dict of its own, obtained from counts(); totals()
+    adds up the dicts of every thread. When a thread exits its counts are
+    folded into a running total, so servers that start a thread per request
+    don't accumulate one dict per request.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._live: Dict[int, Dict[Hashable, float]] = {}
+        self._retired: Dict[Hashable, float] = {}
+        self._ids = itertools.count()
+        # Taken when a thread first counts or exits and when reading, never when counting
+        self._lock = threading.RLock()
+    
+    def counts(self) -> Dict[Hashable, float]:
+        """Return the calling thread's dict of counts, for it alone to update."""
+        try:
+            return self._local.counts
+        except AttributeError:
+            return self._register()
+    
+    def _register(self) -> Dict[Hashable, float]:
+        counts: Dict[Hashable, float] = {}
+        token = _ThreadToken()
+        thread_id = next(self._ids)
+        with self._lock:
+            self._live[thread_id] = counts
+        weakref.finalize(token, self._retire, thread_id)
+        self._local.token = token
+        self._local.counts = counts
+        return counts
+    
+    def _retire(self, thread_id: int):
+        """Fold an exited thread's counts into the running total."""
+        with self._lock:
+            _add(self._retired, self._live.pop(thread_id))
+    
+    def totals(self) -> Dict[Hashable, float]:
+        """Return the counts of every thread added together."""
+        with self._lock:
+            totals = dict(self._retired)
+            for counts in list(self._live.values()):
+                _add(totals, counts.copy())
+        return totals
+    
+    def reset(self):
+        """Zero every count. Threads counting at the same moment may keep a few counts."""
+        with self._lock:
+            self._retired.clear()
+            for counts in self._live.values():
+                counts.clear()
+
+
+def _add(totals: Dict[Hashable, float], counts: Dict[Hashable, float]):
+    for key, value in counts.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+class QueryStats:
+    """Per-rule hit counts and per-stage timings of answered queries."""
+    
+    def __init__(self, rule_count: int):
+        """Create empty counters for rules 1..rule_count, the last of which is the default."""
+        self.rule_count = rule_count
+        self._tally = ThreadTally()
+    
+    def record(self, rule: int, normalize_seconds: float, match_seconds: float, select_seconds: float):
+        """Count one answered query: the rule that fired and the time spent in each stage."""
+        counts = self._tally.counts()
+        counts[rule] = counts.get(rule, 0) + 1
+        counts['normalize'] = counts.get('normalize', 0.0) + normalize_seconds
+        counts['match'] = counts.get('match', 0.0) + match_seconds
+        counts['select'] = counts.get('select', 0.0) + select_seconds
+    
+    def reset(self):
+        """Zero every counter. Threads recording at the same moment may keep a few counts."""
+        self._tally.reset()
+    
+    def snapshot(self, categories: Sequence[str]) -> Dict:
+        """
+        Return the totals over all threads: queries answered, hits per rule
+        (labelled with `categories`, the category of each rule in order),
+        default fallbacks, and total and mean seconds per stage.
+        """
+        totals = self._tally.totals()
+        rule_hits = [totals.get(rule, 0) for rule in range(self.rule_count + 1)]
+        queries = sum(rule_hits)
+        return {
+            'queries': queries,
+            'rules': [
+                {'rule': rule, 'category': category, 'hits': rule_hits[rule]}
+                for rule, category in enumerate(categories, 1)
+            ],
+            'default_fallbacks': rule_hits[self.rule_count],
+            'stages': {
+                stage: {
+                    'total_seconds': totals.get(stage, 0.0),
+                    'mean_seconds': totals.get(stage, 0.0) / queries if queries else 0.0,
+                }
+                for stage in STAGES
+            },
+        }
@@ -0,0 +1,270 @@
+"""
+Load Test for the Study Assistant Web App
+=========================================
+Generates HTTP load against the web app entirely on this machine, to size
+the deployment before real traffic arrives. Worker threads send a weighted
+mix of /chat, / and /health requests, each worker keeping its own session,
+and the run reports throughput, error rates and latency percentiles per
+endpoint.
+
+By default requests go through Flask's test client, which measures the app
+itself; --server starts a local threaded WSGI server and sends real HTTP
+requests to it, which adds the socket and HTTP parsing cost. Both run in
+this process, so with the GIL the numbers describe one Python worker, the
+unit a serverless deployment scales by.
+
+    python load_test.py                                   # ../app.py, 8 workers, 10 seconds
+    python load_test.py --concurrency 32 --duration 30 --mix chat=18,index=1,health=1
+    python load_test.py --server --app app.py --output load.json
+"""
+
+import argparse
+import http.client
+import importlib.util
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+# The app vercel.json routes every request to
+DEFAULT_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app.py')
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 10.0
+DEFAULT_MIX = 'chat=8,index=1,health=1'
+DEFAULT_SEED = 1234
+
+# Endpoint name -> (method, path)
+ENDPOINTS = {
+    'chat': ('POST', '/chat'),
+    'index': ('GET', '/'),
+    'health': ('GET', '/health'),
+}
+
+# Distinct chat messages the workers draw from
+QUERY_POOL_SIZE = 2000
+
+
+class Sample(NamedTuple):
+    """One request: its endpoint, latency in nanoseconds and status (0 if it failed without a response)."""
+    endpoint: str
+    latency_ns: int
+    status: int
+
+
+def load_app(path: str):
+    """Import a web app module from a file path, with its directory first on the import path."""
+    path = os.path.abspath(path)
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location('load_test_target', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse a request mix such as "chat=8,index=1,health=1" into weights per endpoint."""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("The request mix needs at least one endpoint with a positive weight")
+    return weights
+
+
+class TestClientTransport:
+    """Sends requests through Flask's test client, without any networking."""
+    __test__ = False  # not a pytest test class, despite the name
+    
+    def __init__(self, app):
+        self.app = app
+    
+    def connect(self):
+        client = self.app.test_client()
+        
+        def send(method: str, path: str, body: Optional[bytes]) -> int:
+            response = client.open(path, method=method, data=body, content_type='application/json')
+            response.get_data()
+            return response.status_code
+        return send
+    
+    def close(self):
+        pass
+
+
+class ServerTransport:
+    """Serves the app from a local threaded WSGI server and sends it real HTTP requests."""
+    
+    def __init__(self, app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass  # one log line per request would dominate the measurement
+        
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def connect(self):
+        port = self.port
+        
+        def send(method: str, path: str, body: Optional[bytes]) -> int:
+            # The development server closes every connection, so each request opens one
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            try:
+                headers = {'Content-Type': 'application/json'} if body is not None else {}
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            finally:
+                connection.close()
+        return send
+    
+    def close(self):
+        self.server.shutdown()
+
+
+def worker(transport, weights: Dict[str, float], queries: List[str], seed: int,
+           deadline: float, budget: Optional[itertools.count], limit: Optional[int]) -> List[Sample]:
+    """Send requests until the deadline passes or the shared request budget runs out."""
+    rng = random.Random(seed)
+    send = transport.connect()
+    names = list(weights)
+    cumulative = list(itertools.accumulate(weights[name] for name in names))
+    session_id = f'loadtest{seed:016d}'
+    clock = time.perf_counter_ns
+    samples = []
+    while time.perf_counter() < deadline:
+        if budget is not None and next(budget) >= limit:
+            break
+        endpoint = rng.choices(names, cum_weights=cumulative)[0]
+        method, path = ENDPOINTS[endpoint]
+        body = None
+        if endpoint == 'chat':
+            body = json.dumps({'message': rng.choice(queries), 'session_id': session_id}).encode('utf-8')
+        started = clock()
+        try:
+            status = send(method, path, body)
+        except Exception:
+            status = 0
+        samples.append(Sample(endpoint, clock() - started, status))
+    return samples
+
+
+def percentile(sorted_values: List[int], fraction: float) -> float:
+    """Return the value below which `fraction` of the sorted values fall."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    """Aggregate samples into throughput, error rate and latency percentiles, overall and per endpoint."""
+    groups: Dict[str, List[Sample]] = {'all': samples}
+    for sample in samples:
+        groups.setdefault(sample.endpoint, []).append(sample)
+    summary = {}
+    for name, group in groups.items():
+        latencies = sorted(sample.latency_ns for sample in group)
+        errors = sum(1 for sample in group if not 200 <= sample.status < 300)
+        summary[name] = {
+            'requests': len(group),
+            'requests_per_second': len(group) / elapsed if elapsed else 0.0,
+            'errors': errors,
+            'error_rate': errors / len(group) if group else 0.0,
+            'p50_ms': percentile(latencies, 0.50) / 1e6 if latencies else None,
+            'p90_ms': percentile(latencies, 0.90) / 1e6 if latencies else None,
+            'p99_ms': percentile(latencies, 0.99) / 1e6 if latencies else None,
+            'max_ms': latencies[-1] / 1e6 if latencies else None,
+        }
+    return summary
+
+
+def run(app_path: str, concurrency: int, duration: float, requests: Optional[int], mix: str,
+        server: bool, seed: int) -> Dict:
+    """Load the app, run the workers and return the configuration and summary of the run."""
+    weights = parse_mix(mix)
+    module = load_app(app_path)
+    from benchmark import CORPORA, generate_queries  # after the app, so it shares the app's modules
+    keywords = sorted({keyword for group in module.assistant.keyword_groups.values() for keyword in group})
+    queries = generate_queries(CORPORA['chat'], keywords, QUERY_POOL_SIZE, seed)
+    
+    transport = ServerTransport(module.app) if server else TestClientTransport(module.app)
+    budget = itertools.count() if requests is not None else None
+    results: List[List[Sample]] = [[] for _ in range(concurrency)]
+    
+    def work(index: int):
+        results[index] = worker(transport, weights, queries, seed + index, deadline, budget, requests)
+    
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(concurrency)]
+    started = time.perf_counter()
+    deadline = started + duration
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    transport.close()
+    
+    samples = [sample for result in results for sample in result]
+    return {
+        'app': os.path.relpath(os.path.abspath(app_path)),
+        'transport': 'server' if server else 'test_client',
+        'concurrency': concurrency,
+        'duration_seconds': elapsed,
+        'mix': weights,
+        'seed': seed,
+        'endpoints': summarize(samples, elapsed),
+    }
+
+
+def print_report(report: Dict):
+    """Print a run's summary as a table."""
+    print(f"{report['app']} via {report['transport']}, {report['concurrency']} workers, "
+          f"{report['duration_seconds']:.1f} s")
+    print(f"{'endpoint':<8} {'requests':>9} {'req/s':>9} {'errors':>7} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, stats in report['endpoints'].items():
+        if not stats['requests']:
+            continue
+        print(f"{name:<8} {stats['requests']:>9} {stats['requests_per_second']:>9.0f} "
+              f"{stats['error_rate']:>7.2%} {stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+
+
+def main():
+    """Run a load test configured on the command line."""
+    parser = argparse.ArgumentParser(description="Load test the Study Assistant web app in-process.")
+    parser.add_argument('--app', default=DEFAULT_APP, help="web app module to load (default: ../app.py, the deployed app)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="worker threads")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="seconds to run for")
+    parser.add_argument('--requests', type=int, help="stop after this many requests in total")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"request weights per endpoint (default: {DEFAULT_MIX})")
+    parser.add_argument('--server', action='store_true', help="send real HTTP requests to a local server")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="seed of the request generator")
+    parser.add_argument('--output', help="JSON file to write the results to")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    try:
+        parse_mix(args.mix)
+    except ValueError as error:
+        parser.error(str(error))
+    
+    report = run(args.app, args.concurrency, args.duration, args.requests, args.mix, args.server, args.seed)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
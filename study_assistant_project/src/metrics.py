@@ -0,0 +1,247 @@
+"""
+Metrics
+=======
+Prometheus metrics for the web apps, rendered in the Prometheus text format
+by the /metrics endpoint. Counters and histograms are updated on the request
+path through per-thread tallies, so recording never takes a lock and a
+scrape never holds one that a request needs; everything else (sessions,
+cache, rule hits) is read from the assistant when scraped.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from instrumentation import ThreadTally
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Request methods counted under their own name; any other method a client
+# sends is counted as 'other', so clients cannot create new series at will
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'CONNECT', 'OPTIONS', 'TRACE', 'PATCH'))
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Labels, Labels, float]  # (name, label names, label values, value)
+
+
+def format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metric:
+    """A named metric with a help text and a fixed set of label names."""
+    type = 'untyped'
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+    
+    def samples(self) -> Iterable[Sample]:
+        """Yield the metric's current samples."""
+        return ()
+    
+    def render(self) -> Iterator[str]:
+        """Yield the metric's lines in the text format."""
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.type}'
+        for name, labelnames, labelvalues, value in self.samples():
+            if labelnames:
+                labels = ','.join(f'{label}="{escape_label(str(labelvalue))}"'
+                                  for label, labelvalue in zip(labelnames, labelvalues))
+                yield f'{name}{{{labels}}} {format_value(value)}'
+            else:
+                yield f'{name} {format_value(value)}'
+
+
+class Counter(Metric):
+    """A monotonically increasing count per combination of label values."""
+    type = 'counter'
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._tally = ThreadTally()
+    
+    def inc(self, labelvalues: Labels = (), amount: float = 1):
+        """Add `amount` to the count of the given label values."""
+        counts = self._tally.counts()
+        counts[labelvalues] = counts.get(labelvalues, 0) + amount
+    
+    def samples(self) -> Iterable[Sample]:
+        for labelvalues, value in sorted(self._tally.totals().items()):
+            yield self.name, self.labelnames, labelvalues, value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum, per combination of label values."""
+    type = 'histogram'
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._tally = ThreadTally()
+    
+    def observe(self, value: float, labelvalues: Labels = ()):
+        """Count one observation of `value` for the given label values."""
+        counts = self._tally.counts()
+        key = (labelvalues, bisect.bisect_left(self.buckets, value))
+        counts[key] = counts.get(key, 0) + 1
+        key = (labelvalues, 'sum')
+        counts[key] = counts.get(key, 0.0) + value
+    
+    def samples(self) -> Iterable[Sample]:
+        by_labels: Dict[Labels, List[float]] = {}
+        for (labelvalues, bucket), value in self._tally.totals().items():
+            # One count per bucket plus the +Inf bucket, then the sum
+            series = by_labels.setdefault(labelvalues, [0] * (len(self.buckets) + 1) + [0.0])
+            series[-1 if bucket == 'sum' else bucket] += value
+        labelnames = self.labelnames + ('le',)
+        for labelvalues, series in sorted(by_labels.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                yield self.name + '_bucket', labelnames, labelvalues + (format_value(bound),), cumulative
+            yield self.name + '_sum', self.labelnames, labelvalues, series[-1]
+            yield self.name + '_count', self.labelnames, labelvalues, cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    A metric whose samples are read when scraped: `read` returns a single
+    value, or (label values, value) pairs when the metric has labels.
+    """
+    
+    def __init__(self, name: str, help: str, type: str,
+                 read: Callable[[], Union[float, Iterable[Tuple[Labels, float]]]],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.type = type
+        self.read = read
+    
+    def samples(self) -> Iterable[Sample]:
+        if not self.labelnames:
+            yield self.name, (), (), self.read()
+            return
+        for labelvalues, value in self.read():
+            yield self.name, self.labelnames, labelvalues, value
+
+
+class MetricsRegistry:
+    """The metrics of one app, rendered together for a scrape."""
+    
+    def __init__(self):
+        self.metrics: List[Metric] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric and return it."""
+        if any(existing.name == metric.name for existing in self.metrics):
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+    
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+    
+    def gauge(self, name: str, help: str, read: Callable, labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, 'gauge', read, labelnames))
+    
+    def counter_callback(self, name: str, help: str, read: Callable,
+                         labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, 'counter', read, labelnames))
+    
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class AppMetrics:
+    """
+    The metrics every web app exports: requests and their latency by route,
+    live sessions and the memory their histories take, query cache hit
+    ratio, and (when the assistant is instrumented) answers per category and
+    time per query stage. The assistant's and the sessions' stats are read
+    once per scrape and shared by every metric taken from them.
+    """
+    
+    def __init__(self, assistant, sessions):
+        self.assistant = assistant
+        self.sessions = sessions
+        self._render_lock = threading.Lock()
+        self._assistant_stats: Dict = {}
+        self._session_stats: Dict = {}
+        self.registry = registry = MetricsRegistry()
+        self.requests = registry.counter(
+            'study_assistant_http_requests_total', 'HTTP requests answered.', ('method', 'route', 'status'))
+        self.latency = registry.histogram(
+            'study_assistant_http_request_duration_seconds', 'Time spent answering HTTP requests.', ('route',))
+        registry.gauge('study_assistant_sessions', 'Live conversation sessions.',
+                       lambda: self._session_stats['sessions'])
+        registry.gauge('study_assistant_history_turns', 'Conversation turns stored across all sessions.',
+                       lambda: self._session_stats['turns'])
+        registry.gauge('study_assistant_history_bytes', 'Estimated memory taken by stored conversation turns.',
+                       lambda: self._session_stats['history_bytes'])
+        registry.gauge('study_assistant_query_cache_hit_ratio',
+                       'Share of classification cache lookups that hit, since the rules were last loaded.',
+                       lambda: self._cache_stats().get('hit_ratio', 0.0))
+        registry.counter_callback('study_assistant_query_cache_lookups',
+                                  'Classification cache lookups since the rules were last loaded.',
+                                  lambda: self._cache_lookups(), ('result',))
+        registry.gauge('study_assistant_query_cache_entries', 'Classifications currently cached.',
+                       lambda: self._cache_stats().get('size', 0))
+        registry.counter_callback('study_assistant_answers_total', 'Queries answered, by rule category.',
+                                  lambda: self._answers(), ('category',))
+        registry.counter_callback('study_assistant_stage_seconds_total',
+                                  'Time spent in each stage of answering queries.',
+                                  lambda: self._stage_seconds(), ('stage',))
+    
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        """Count a finished request and its latency."""
+        if method not in HTTP_METHODS:
+            method = 'other'
+        self.requests.inc((method, route, str(status)))
+        self.latency.observe(seconds, (route,))
+    
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+        with self._render_lock:
+            self._assistant_stats = self.assistant.stats()
+            self._session_stats = self.sessions.stats()
+            return self.registry.render()
+    
+    def _cache_stats(self) -> Dict:
+        return self._assistant_stats['cache'] or {}
+    
+    def _cache_lookups(self) -> Iterable[Tuple[Labels, float]]:
+        cache = self._cache_stats()
+        return [(('hit',), cache.get('hits', 0)), (('miss',), cache.get('misses', 0))]
+    
+    def _answers(self) -> Iterable[Tuple[Labels, float]]:
+        stats = self._assistant_stats
+        return [((rule['category'],), rule['hits']) for rule in stats.get('rules', ())]
+    
+    def _stage_seconds(self) -> Iterable[Tuple[Labels, float]]:
+        stats = self._assistant_stats
+        return [((stage,), timing['total_seconds']) for stage, timing in stats.get('stages', {}).items()]
@@ -0,0 +1,54 @@
+"""
+Input Normalizer
+================
+Brings user input into the form the keyword matchers expect: compatibility
+characters folded (NFKC, so full-width "ｍａｔｈ" becomes "math"), case folded,
+punctuation and symbols replaced by spaces ("math?!" becomes "math",
+"math+exam" becomes "math exam") and whitespace collapsed. Plain-ASCII
+input, by far the most common, skips the Unicode work entirely and is
+translated as bytes, with a table built from the same characters.
+"""
+
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Apostrophes are dropped rather than split on, so "what's" stays one word
+APOSTROPHES = "'’ʼ"
+
+
+def is_separator(char: str) -> bool:
+    """Whether a character separates words: any punctuation or symbol except an apostrophe."""
+    return unicodedata.category(char)[0] in 'PS' and char not in APOSTROPHES
+
+
+ASCII_PUNCTUATION = ''.join(char for char in map(chr, range(128)) if is_separator(char))
+ASCII_TABLE = bytes.maketrans(ASCII_PUNCTUATION.encode('ascii'), b' ' * len(ASCII_PUNCTUATION))
+ASCII_DELETE = b"'"
+
+
+@lru_cache(maxsize=1)
+def unicode_table() -> Dict[int, Optional[str]]:
+    """
+    Translation table for every punctuation and symbol character of the
+    Basic Multilingual Plane. Built on the first non-ASCII input (a few tens
+    of milliseconds), so ASCII-only traffic never pays for it.
+    """
+    table: Dict[int, Optional[str]] = {}
+    for codepoint in range(min(sys.maxunicode, 0xFFFF) + 1):
+        char = chr(codepoint)
+        if char in APOSTROPHES:
+            table[codepoint] = None
+        elif is_separator(char):
+            table[codepoint] = ' '
+    return table
+
+
+def normalize(text: str) -> str:
+    """Return text folded for matching: NFKC, casefolded, without punctuation, single-spaced."""
+    if text.isascii():
+        text = text.encode('ascii').lower().translate(ASCII_TABLE, ASCII_DELETE).decode('ascii')
+    else:
+        text = unicodedata.normalize('NFKC', text).casefold().translate(unicode_table())
+    return ' '.join(text.split())
@@ -0,0 +1,87 @@
+"""
+Query Cache
+===========
+Bounded, thread-safe LRU cache for per-query results.
+Student traffic repeats heavily (the suggestion chips send the same queries
+over and over), so classifications are memoized by normalized query text.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class QueryCache:
+    """
+    Least-recently-used cache with hit and miss counters.
+    All operations take a lock, so one cache can be shared by every worker
+    thread. Values should be immutable, since they are shared between callers.
+    """
+    
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Create an empty cache holding at most `maxsize` entries."""
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for a key and mark it most recently used."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Cache a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[Hashable], Any]) -> Any:
+        """
+        Return the cached value for a key, computing and caching it on a miss.
+        The computation runs outside the lock, so a slow miss never blocks hits.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(key)
+            self.put(key, value)
+        return value
+    
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """Return the hit/miss counters, current size and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
@@ -0,0 +1,294 @@
+"""
+Regression Gate for Study Assistant
+===================================
+Guards matcher optimizations with a golden corpus of queries
+(golden_queries.jsonl), each stored with the rule, category, subject and
+response that process_query gives it today. The gate fails when:
+
+- process_query no longer gives a golden query its recorded answer,
+- an engine that must answer exactly like process_query (the cached and
+  uncached respond, instrumented, process_queries and, with NumPy, the
+  batch classifier) returns a different response for any golden query, or
+- an engine's throughput on the corpus, relative to a calibration loop
+  timed alongside it, falls more than --threshold below the stored
+  baseline (golden_baseline.json).
+
+    python regression_gate.py                    # check answers and throughput
+    python regression_gate.py --skip-throughput  # check answers only
+    python regression_gate.py --update-baseline  # after a deliberate speed change, on the reference machine
+    python regression_gate.py --update-corpus    # after a deliberate change to the rules
+
+The baseline holds throughput measured on one machine, so compare against
+a baseline recorded on the same machine (the gate warns when it differs).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmark import CORPORA, ENGINES, generate_queries, measure
+from study_assistant import StudyAssistant
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, 'golden_queries.jsonl')
+BASELINE_PATH = os.path.join(HERE, 'golden_baseline.json')
+
+# Engines that must answer every query exactly like process_query
+EQUIVALENT_ENGINES = ('respond', 'respond-uncached', 'instrumented', 'process_queries', 'numpy')
+
+# Engines whose throughput is held against the baseline
+THROUGHPUT_ENGINES = ('process_query', 'respond', 'respond-uncached', 'process_queries', 'numpy')
+
+DEFAULT_THRESHOLD = 0.2  # largest tolerated throughput drop, as a share of the baseline
+DEFAULT_REPEATS = 5      # throughput is the best of this many rounds
+THROUGHPUT_PASSES = 5    # passes over the corpus per run, so a run lasts long enough to time reliably
+CALIBRATION_LOOPS = 20000
+
+# Mismatches printed per check
+MAX_REPORTED = 10
+
+# Hand-written queries the corpus always starts with: the test script's and
+# README's examples, and inputs that have tripped up matching before
+HANDWRITTEN_QUERIES = (
+    "Hello!",
+    "How should I study for mathematics?",
+    "I have an exam next week, how should I prepare?",
+    "I'm feeling unmotivated and tired",
+    "What's the best way to manage my study time?",
+    "Can you help me with programming?",
+    "I'm feeling unmotivated",
+    "hi",
+    "this is it",
+    "HELLO THERE",
+    "hey, what's up?",
+    "help",
+    "what can you do",
+    "I have a calculus exam tomorrow",
+    "I'm tired of my calculus exam",
+    "I'm tired and lazy, it's so hard before my exam",
+    "How do I study biology and chemistry?",
+    "History essay tips please",
+    "I keep procrastinating on my python homework",
+    "procrastination",
+    "Schedule for finals week",
+    "mathmatics",
+    "ｍａｔｈ ｅｘａｍ",
+    "Math?!",
+    "math... exam!!!",
+    "  spaced    out   query  ",
+    "don't know where to start",
+    "Café Français grammar",
+    "??",
+    "zzz",
+    "1234567890",
+)
+
+# (corpus, queries, seed) of the synthetic part of the corpus
+SYNTHETIC_QUERIES = (
+    ('chips', 500, 1),
+    ('chat', 2000, 2),
+    ('unique', 1000, 3),
+    ('miss', 300, 4),
+    ('essays', 100, 5),
+)
+
+
+def digest(text: str) -> str:
+    """Short fingerprint of a response text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def golden_entry(assistant: StudyAssistant, query: str) -> Dict:
+    """Record what process_query answers to a query today."""
+    answer = assistant.respond(query)
+    return {
+        'query': query,
+        'rule': answer.rule,
+        'category': answer.category,
+        'subject': answer.subject,
+        'response': answer.response.key,
+        'digest': digest(answer.response.text),
+    }
+
+
+def build_corpus() -> List[Dict]:
+    """Generate the golden corpus: the handwritten queries, then the synthetic ones."""
+    assistant = StudyAssistant(cache_size=0)
+    keywords = sorted({keyword for group in assistant.keyword_groups.values() for keyword in group})
+    queries = list(HANDWRITTEN_QUERIES)
+    for corpus, count, seed in SYNTHETIC_QUERIES:
+        queries.extend(generate_queries(CORPORA[corpus], keywords, count, seed))
+    return [golden_entry(assistant, query) for query in queries]
+
+
+def read_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    with open(path, encoding='utf-8') as corpus:
+        return [json.loads(line) for line in corpus if line.strip()]
+
+
+def write_corpus(entries: List[Dict], path: str = CORPUS_PATH):
+    with open(path, 'w', encoding='utf-8', newline='\n') as corpus:
+        for entry in entries:
+            corpus.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def engine_answers(name: str, queries: List[str]) -> Optional[List[str]]:
+    """Return an engine's response to every query, or None if the engine is unavailable."""
+    try:
+        engine = ENGINES[name]()
+    except ImportError:
+        return None
+    if engine.answer is None:
+        return list(engine.answer_all(queries))
+    return [engine.answer(query) for query in queries]
+
+
+def check_answers(entries: List[Dict]) -> int:
+    """Check process_query and every equivalent engine against the corpus; return the number of failures."""
+    queries = [entry['query'] for entry in entries]
+    failures = 0
+    
+    assistant = StudyAssistant()
+    mismatches = []
+    expected_texts = []
+    for entry in entries:
+        text = assistant.process_query(entry['query'])
+        expected_texts.append(text)
+        actual = golden_entry(assistant, entry['query'])
+        if actual != entry or actual['digest'] != digest(text):
+            mismatches.append((entry, actual))
+    print(f"process_query     {len(entries) - len(mismatches)}/{len(entries)} golden answers")
+    for entry, actual in mismatches[:MAX_REPORTED]:
+        changed = {field: (entry[field], actual[field]) for field in entry if entry[field] != actual[field]}
+        print(f"    {entry['query'][:60]!r}: {changed}")
+    failures += len(mismatches)
+    
+    for name in EQUIVALENT_ENGINES:
+        texts = engine_answers(name, queries)
+        if texts is None:
+            print(f"{name:<17} skipped (not available)")
+            continue
+        different = [index for index, (text, expected) in enumerate(zip(texts, expected_texts))
+                     if text != expected]
+        print(f"{name:<17} {len(queries) - len(different)}/{len(queries)} same as process_query")
+        for index in different[:MAX_REPORTED]:
+            print(f"    {queries[index][:60]!r}: {texts[index][:40]!r} instead of {expected_texts[index][:40]!r}")
+        failures += len(different)
+    return failures
+
+
+def calibrate() -> float:
+    """
+    Return how fast this machine runs a fixed piece of plain Python work
+    (splitting and counting words), in loops per second. Throughput is
+    compared relative to it, which cancels out a machine that is busy or
+    throttled while the gate runs.
+    """
+    text = ' '.join(('study', 'for', 'the', 'math', 'exam') * 20)
+    started = time.perf_counter()
+    for _ in range(CALIBRATION_LOOPS):
+        counts = {}
+        for word in text.split():
+            counts[word] = counts.get(word, 0) + 1
+    return CALIBRATION_LOOPS / (time.perf_counter() - started)
+
+
+def measure_throughput(queries: List[str], repeats: int) -> Tuple[Dict[str, float], float]:
+    """
+    Return each available engine's throughput on the queries, in queries per
+    second at the machine's best calibrated speed, and that speed. Each
+    round runs the calibration and then every engine once, so all of them
+    see the same conditions, and each engine keeps its best round.
+    """
+    queries = queries * THROUGHPUT_PASSES
+    relative: Dict[str, float] = {}
+    best_speed = 0.0
+    for _ in range(repeats):
+        speed = calibrate()
+        best_speed = max(best_speed, speed)
+        for name in THROUGHPUT_ENGINES:
+            try:
+                engine = ENGINES[name]()
+            except ImportError:
+                continue
+            ratio = measure(engine, queries)['queries_per_second'] / speed
+            relative[name] = max(relative.get(name, 0.0), ratio)
+    return {name: ratio * best_speed for name, ratio in relative.items()}, best_speed
+
+
+def check_throughput(queries: List[str], baseline: Dict, threshold: float, repeats: int) -> int:
+    """Compare throughput against the baseline; return the number of engines that regressed."""
+    if baseline['platform'] != platform.platform() or baseline['python'] != sys.version.split()[0]:
+        print(f"warning: baseline recorded on {baseline['platform']} with Python {baseline['python']}")
+    throughput, speed = measure_throughput(queries, repeats)
+    print(f"calibration: {speed / baseline['calibration']:.2f}x the baseline machine speed")
+    regressions = 0
+    for name, current in throughput.items():
+        recorded = baseline['queries_per_second'].get(name)
+        if recorded is None:
+            print(f"{name:<17} {current:>12,.0f} q/s (no baseline)")
+            continue
+        change = (current / speed) / (recorded / baseline['calibration']) - 1
+        regressed = change < -threshold
+        regressions += regressed
+        print(f"{name:<17} {current:>12,.0f} q/s  baseline {recorded:>12,.0f}  {change:+7.1%}"
+              + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    """Run the gate, or refresh its corpus or baseline, as selected on the command line."""
+    parser = argparse.ArgumentParser(description="Check the engines against the golden query corpus.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"largest tolerated throughput drop (default {DEFAULT_THRESHOLD:.0%})")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="throughput rounds (every engine runs once per round)")
+    parser.add_argument('--skip-throughput', action='store_true', help="only check the answers")
+    parser.add_argument('--update-corpus', action='store_true',
+                        help="regenerate the corpus from today's process_query")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="record this machine's throughput as the baseline")
+    args = parser.parse_args()
+    
+    if args.update_corpus:
+        entries = build_corpus()
+        write_corpus(entries)
+        print(f"Wrote {len(entries)} golden queries to {CORPUS_PATH}")
+        return
+    
+    entries = read_corpus()
+    queries = [entry['query'] for entry in entries]
+    print(f"Checking {len(entries)} golden queries")
+    failures = check_answers(entries)
+    if args.update_baseline:
+        if failures:
+            sys.exit("\nFAILED: fix the answers before recording a baseline")
+        throughput, speed = measure_throughput(queries, args.repeats)
+        baseline = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'queries': len(queries),
+            'calibration': speed,
+            'queries_per_second': throughput,
+        }
+        with open(BASELINE_PATH, 'w', encoding='utf-8', newline='\n') as output:
+            json.dump(baseline, output, indent=2)
+            output.write('\n')
+        print(f"\nWrote the throughput baseline to {BASELINE_PATH}")
+        return
+    
+    if not args.skip_throughput:
+        with open(BASELINE_PATH, encoding='utf-8') as stored:
+            baseline = json.load(stored)
+        print(f"\nThroughput (best of {args.repeats} rounds, at most {args.threshold:.0%} below the baseline):")
+        failures += check_throughput(queries, baseline, args.threshold, args.repeats)
+    print("\nPASSED" if not failures else "\nFAILED")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
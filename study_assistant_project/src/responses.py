@@ -0,0 +1,109 @@
+"""
+Response Catalog
+================
+Every response the Study Assistant can give, built once when the rules are
+loaded (see rules.json). Each entry has a stable numeric ID and carries its
+text together with its pre-encoded JSON form, which the /chat handlers
+splice into their replies (see chat_reply) instead of encoding the text
+again for every query. Composite responses, which answer several intents at
+once, are joined from the encoded forms of their parts the first time they
+are needed.
+"""
+
+import json
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# Separates the parts of a composite response
+PART_SEPARATOR = '\n\n'
+
+
+class Response(NamedTuple):
+    """An immutable catalog entry."""
+    id: int
+    key: str
+    text: str
+    json: bytes  # the text as a JSON string literal, UTF-8 encoded
+
+
+def make_response(response_id: int, key: str, text: str) -> Response:
+    """Create a catalog entry with its encoded forms precomputed."""
+    return Response(response_id, key, text, json.dumps(text).encode('utf-8'))
+
+
+def compose_response(response_id: int, key: str, parts: Sequence[Response]) -> Response:
+    """Join catalog entries into one, concatenating their pre-encoded forms."""
+    json_separator = json.dumps(PART_SEPARATOR)[1:-1].encode('utf-8')
+    encoded = b'"' + json_separator.join(part.json[1:-1] for part in parts) + b'"'
+    return Response(response_id, key, PART_SEPARATOR.join(part.text for part in parts), encoded)
+
+
+def chat_reply(response: Response, session_id: str) -> bytes:
+    """Encode the JSON body of a /chat reply around the response's pre-encoded text."""
+    return b'{"response":' + response.json + b',"session_id":' + json.dumps(session_id).encode('utf-8') + b'}\n'
+
+
+class ResponseCatalog:
+    """
+    Read-only collection of responses, addressable by ID or by key.
+    IDs are assigned in definition order, so new entries must be appended
+    to keep existing IDs stable. Composite entries are numbered after the
+    plain ones and composed on first access; iterating, len() and key
+    lookups only cover the plain entries.
+    """
+    
+    def __init__(self, entries: Iterable[Tuple[str, str]], composites: Iterable[Tuple[str, ...]] = ()):
+        """Build the catalog from (key, text) pairs and the keys of the parts of each composite."""
+        self._responses = tuple(
+            make_response(response_id, key, text)
+            for response_id, (key, text) in enumerate(entries)
+        )
+        self._by_key = {response.key: response for response in self._responses}
+        self._composites = tuple(composites)
+        self._composed: Dict[int, Response] = {}
+    
+    def __getitem__(self, response_id: int) -> Response:
+        """Return the entry with the given ID."""
+        if response_id < len(self._responses):
+            return self._responses[response_id]
+        response = self._composed.get(response_id)
+        if response is None:
+            keys = self._composites[response_id - len(self._responses)]
+            response = compose_response(response_id, '+'.join(keys), [self._by_key[key] for key in keys])
+            response = self._composed.setdefault(response_id, response)
+        return response
+    
+    def composite_id(self, index: int) -> int:
+        """Return the ID of the composite given as the index-th entry of `composites`."""
+        return len(self._responses) + index
+    
+    def __len__(self) -> int:
+        return len(self._responses)
+    
+    def __iter__(self):
+        return iter(self._responses)
+    
+    def by_key(self, key: str) -> Response:
+        """Return the entry with the given key."""
+        return self._by_key[key]
+    
+    def get(self, key: str, default: Response = None) -> Response:
+        """Return the entry with the given key, or default if there is none."""
+        return self._by_key.get(key, default)
+
+
+def catalog_entries(texts: Dict[str, str], subject_advice: Dict[str, str],
+                    combined: Iterable[str] = ('exam',)) -> List[Tuple[str, str]]:
+    """
+    List the (key, text) pairs of a catalog: the plain responses, then for
+    each subject its advice ('subject:<name>') and, for every intent in
+    `combined`, that intent's response followed by the subject advice
+    ('<intent>:<name>'). Adding a subject at the end therefore leaves every
+    existing ID unchanged.
+    """
+    combined = list(combined)
+    entries = list(texts.items())
+    for subject, advice in subject_advice.items():
+        entries.append((f'subject:{subject}', advice))
+        for intent in combined:
+            entries.append((f'{intent}:{subject}', f"{texts[intent]}{PART_SEPARATOR}{advice}"))
+    return entries
@@ -0,0 +1,420 @@
+"""
+Rule Loader
+===========
+Loads the Study Assistant's keywords, rule priority and responses from a
+declarative JSON file (rules.json) and compiles them into a RuleSet with
+ready-to-use matchers, typo index, response catalog and decision table.
+
+Compiled rule sets are cached in a binary snapshot next to the rules file,
+so a cold start only has to hash the rules file and unpickle the snapshot.
+Run this module to (re)build the snapshot ahead of deployment:
+
+    python rule_loader.py [rules.json]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from keyword_matcher import MATCHERS, FuzzyIndex
+from normalizer import normalize
+from responses import Response, ResponseCatalog, catalog_entries
+
+# Intent categories, compiled into the matchers in this order so that each
+# one owns a fixed bit of the classification bitmask; subjects follow them
+INTENTS = ('greeting', 'exam', 'time', 'motivation', 'method', 'help')
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_VERSION = 9  # bump whenever the compiled RuleSet or the matchers change
+DEFAULT_RELOAD_INTERVAL = 2.0  # seconds between checks of the rules file
+
+# Intents ranked below this share of the total evidence are dropped from a ranking
+DEFAULT_CONFIDENCE_THRESHOLD = 0.2
+
+
+class RuleError(ValueError):
+    """Raised when a rules file is malformed."""
+
+
+class Decision(NamedTuple):
+    """A precomputed entry of the decision table: the rule that fires and its response."""
+    rule: int
+    response: Response
+
+
+class Ranked(NamedTuple):
+    """One category of a ranking: its rule, weighted score and share of the total score."""
+    category: str
+    rule: int
+    score: float
+    confidence: float
+
+
+class RuleSet:
+    """
+    A compiled, read-only set of rules.
+
+    Rule N is the N-th category of the priority list (a category being an
+    intent, or 'subject' for any subject keyword); the rule after the last one
+    is the default response. The decision table holds the outcome of the rules
+    for every combination of intents and first subject.
+
+    Every slot of the decision table also has a composite response, made of
+    the responses of every category present, in priority order ("exam" +
+    "subject:math" + "motivation"); composite_ids holds its catalog ID.
+
+    Rules can also be ranked: every keyword occurrence adds its category's
+    weight (1 unless set in "weights") to the category's score, and equal
+    scores keep the priority order, so with one hit per category the top of
+    the ranking is the rule that fires first.
+    """
+    
+    def __init__(self, spec: Dict, source_hash: str = ''):
+        """Validate a rules specification (the parsed JSON) and compile it."""
+        validate_spec(spec)
+        self.spec = spec
+        self.source_hash = source_hash
+        self.name = spec['name']
+        self.priority = tuple(spec['priority'])
+        self.categories = self.priority + ('default',)  # category of rule N is categories[N - 1]
+        weights = spec.get('weights', {})
+        self.weights = tuple(float(weights.get(category, 1)) for category in self.priority)
+        self.append_subject_advice = frozenset(spec.get('append_subject_advice', ()))
+        self.intent_keywords = {intent: list(spec['intents'][intent]) for intent in INTENTS}
+        self.subject_keywords = {subject: list(keywords) for subject, keywords in spec['subjects'].items()}
+        self.subjects = [None] + list(self.subject_keywords)
+        
+        texts = {key: text.replace('{name}', self.name) for key, text in spec['responses'].items()}
+        entries = catalog_entries(texts, spec['subject_advice'], combined=sorted(self.append_subject_advice))
+        slot_keys = [
+            self.part_keys(intent_hits, subject)
+            for subject in self.subjects
+            for intent_hits in range(1 << len(INTENTS))
+        ]
+        composites = list(dict.fromkeys(keys for keys in slot_keys if self.entry_key(keys) is None))
+        self.catalog = ResponseCatalog(entries, composites)
+        composite_index = {keys: index for index, keys in enumerate(composites)}
+        self.composite_ids = [
+            self.catalog.by_key(self.entry_key(keys)).id if self.entry_key(keys) is not None
+            else self.catalog.composite_id(composite_index[keys])
+            for keys in slot_keys
+        ]
+        
+        self.keyword_groups = dict(self.intent_keywords)
+        self.keyword_groups.update(self.subject_keywords)
+        self.matchers = {mode: matcher(self.keyword_groups) for mode, matcher in MATCHERS.items()}
+        self.group_bits = self.matchers['substring'].group_bits
+        self.fuzzy_index = FuzzyIndex(self.keyword_groups)
+        
+        # keyword group indices (matcher count order) that score for each category
+        groups = list(self.keyword_groups)
+        subject_indices = tuple(range(len(INTENTS), len(groups)))
+        self.category_groups = tuple(
+            subject_indices if category == 'subject' else (groups.index(category),)
+            for category in self.priority
+        )
+        self._scoring = tuple(zip(self.priority, self.category_groups, self.weights))
+        self.decision_table = self.build_decision_table()
+        self.decisive_bits = self.find_decisive_bits()
+    
+    @property
+    def default_rule(self) -> int:
+        """Number of the rule that answers unrecognized queries."""
+        return len(self.priority) + 1
+    
+    def apply_rules(self, hits: int, subject: Optional[str]) -> int:
+        """Return the number of the first rule that fires for a matcher bitmask and subject."""
+        for rule, category in enumerate(self.priority, 1):
+            if category == 'subject':
+                if subject:
+                    return rule
+            elif hits & self.group_bits[category]:
+                return rule
+        return self.default_rule
+    
+    def part_keys(self, intent_hits: int, subject: Optional[str]) -> Tuple[str, ...]:
+        """Catalog keys of the parts of the composite response for a set of intents and subject."""
+        keys = []
+        for category in self.priority:
+            if category == 'subject':
+                if subject:
+                    keys.append(f'subject:{subject}')
+            elif intent_hits & (1 << INTENTS.index(category)):
+                keys.append(category)
+        return tuple(keys)
+    
+    def entry_key(self, keys: Tuple[str, ...]) -> Optional[str]:
+        """Return the key of the plain catalog entry that already equals a composite, if any."""
+        if not keys:
+            return 'default'
+        if len(keys) == 1:
+            return keys[0]
+        if len(keys) == 2 and keys[0] in self.append_subject_advice and keys[1].startswith('subject:'):
+            return f"{keys[0]}:{keys[1][len('subject:'):]}"
+        return None
+    
+    def find_decisive_bits(self) -> int:
+        """
+        Return the bitmask of intents whose presence alone decides the
+        decision (with the default priority, only a greeting): once one of
+        them is found, matching can stop.
+        """
+        bits = 0
+        for position in range(len(INTENTS)):
+            bit = 1 << position
+            outcomes = {(decision.rule, decision.response.id)
+                        for index, decision in enumerate(self.decision_table) if index & bit}
+            if len(outcomes) == 1:
+                bits |= bit
+        return bits
+    
+    def rank(self, counts: List[int], threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[Ranked]:
+        """
+        Rank the categories of the keyword occurrences counted by a matcher,
+        highest score first and ties in priority order. Categories whose
+        confidence is below `threshold` are dropped, except the top one; a
+        text without keywords ranks only the default rule.
+        """
+        scored = []
+        total = 0.0
+        rule = 0
+        for category, indices, weight in self._scoring:
+            rule += 1
+            score = weight * sum(map(counts.__getitem__, indices))
+            if score > 0:
+                scored.append((-score, rule, category))
+                total += score
+        if not scored:
+            return [Ranked('default', self.default_rule, 0.0, 1.0)]
+        scored.sort()
+        ranking = [Ranked(category, rule, -score, -score / total) for score, rule, category in scored]
+        return ranking[:1] + [ranked for ranked in ranking[1:] if ranked.confidence >= threshold]
+    
+    def rule_response(self, rule: int, subject: Optional[str] = None) -> Response:
+        """Look up the catalog response for a rule number and the subject of the query."""
+        catalog = self.catalog
+        if rule == self.default_rule:
+            return catalog.by_key('default')
+        category = self.priority[rule - 1]
+        if category == 'subject':
+            return catalog.get(f'subject:{subject}', catalog.by_key('subject'))
+        if subject and category in self.append_subject_advice:
+            return catalog.by_key(f'{category}:{subject}')
+        return catalog.by_key(category)
+    
+    def build_decision_table(self) -> List[Decision]:
+        """
+        Evaluate the rules once for every combination of intents and subject.
+        Slot (subject position << len(INTENTS)) | intent bits holds the
+        decision; entries share the catalog's response objects.
+        """
+        decisions = {}
+        table = []
+        for subject in self.subjects:
+            subject_bit = self.group_bits[subject] if subject else 0
+            for intent_hits in range(1 << len(INTENTS)):
+                rule = self.apply_rules(intent_hits | subject_bit, subject)
+                response = self.rule_response(rule, subject)
+                table.append(decisions.setdefault((rule, response.id), Decision(rule, response)))
+        return table
+
+
+class CompositeTable(dict):
+    """
+    Decision table whose responses are the composites of a rule set, filled
+    in per combination of intents and subject on first use. The rule of each
+    decision is still the one that fires first.
+    """
+    
+    def __init__(self, rules: RuleSet):
+        super().__init__()
+        self.rules = rules
+    
+    def __missing__(self, index: int) -> Decision:
+        rules = self.rules
+        decision = Decision(rules.decision_table[index].rule, rules.catalog[rules.composite_ids[index]])
+        return self.setdefault(index, decision)
+
+
+def validate_spec(spec: Dict):
+    """Check that a rules specification has every section the rules rely on."""
+    for section in ('name', 'priority', 'intents', 'subjects', 'responses', 'subject_advice'):
+        if section not in spec:
+            raise RuleError(f"Rules are missing the {section!r} section")
+    if set(spec['intents']) != set(INTENTS):
+        raise RuleError(f"Rules must define keywords for exactly these intents: {', '.join(INTENTS)}")
+    if sorted(spec['priority']) != sorted(INTENTS + ('subject',)):
+        raise RuleError("Rule priority must list every intent and 'subject' exactly once")
+    unknown = set(spec.get('weights', {})) - set(spec['priority'])
+    if unknown:
+        raise RuleError(f"Unknown categories in weights: {', '.join(sorted(unknown))}")
+    if any(not isinstance(weight, (int, float)) or weight < 0 for weight in spec.get('weights', {}).values()):
+        raise RuleError("Weights must be non-negative numbers")
+    unknown = set(spec.get('append_subject_advice', ())) - set(INTENTS)
+    if unknown:
+        raise RuleError(f"Unknown intents in append_subject_advice: {', '.join(sorted(unknown))}")
+    overlap = set(spec['subjects']) & set(INTENTS)
+    if overlap:
+        raise RuleError(f"Subjects may not reuse intent names: {', '.join(sorted(overlap))}")
+    missing = (set(INTENTS) | {'default', 'subject'}) - set(spec['responses'])
+    if missing:
+        raise RuleError(f"Rules are missing responses for: {', '.join(sorted(missing))}")
+    if set(spec['subject_advice']) != set(spec['subjects']):
+        raise RuleError("Every subject needs exactly one entry in subject_advice")
+    # Queries are normalized before matching, so a keyword that normalization changes
+    # ("what's up", "C++") could never match anything
+    for category, keywords in list(spec['intents'].items()) + list(spec['subjects'].items()):
+        for keyword in keywords:
+            if normalize(keyword) != keyword:
+                raise RuleError(f"Keyword {keyword!r} of {category!r} is not normalized; "
+                                f"queries are matched as {normalize(keyword)!r}")
+
+
+def snapshot_path(path: str) -> str:
+    """Return where the compiled snapshot of a rules file is stored."""
+    return path + SNAPSHOT_SUFFIX
+
+
+def compile_rules(path: str = RULES_PATH) -> RuleSet:
+    """Parse and compile a rules file, ignoring any snapshot."""
+    with open(path, 'rb') as rules_file:
+        source = rules_file.read()
+    return RuleSet(json.loads(source.decode('utf-8')), hashlib.sha256(source).hexdigest())
+
+
+def write_snapshot(rule_set: RuleSet, path: str):
+    """Store a compiled rule set as a binary snapshot, replacing any existing one atomically."""
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as snapshot_file:
+        pickle.dump((SNAPSHOT_VERSION, rule_set.source_hash, rule_set), snapshot_file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def read_snapshot(path: str, source_hash: str) -> Optional[RuleSet]:
+    """
+    Return the rule set stored in a snapshot, or None if there is no usable
+    snapshot for the given rules file hash. Snapshots are only ever written
+    by this module next to the rules file, so they are trusted like code.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            version, snapshot_hash, rule_set = pickle.load(snapshot_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+    if version != SNAPSHOT_VERSION or snapshot_hash != source_hash:
+        return None
+    return rule_set
+
+
+_loaded: Dict[str, RuleSet] = {}
+
+
+def load_rule_set(path: str = RULES_PATH) -> RuleSet:
+    """
+    Return the compiled rules of a rules file.
+    The rules file is hashed on every call; an unchanged file returns the
+    already loaded rule set, otherwise the snapshot is used if it matches,
+    and only as a last resort are the rules compiled (and the snapshot
+    refreshed, where the filesystem allows it).
+    """
+    with open(path, 'rb') as rules_file:
+        source = rules_file.read()
+    source_hash = hashlib.sha256(source).hexdigest()
+    
+    loaded = _loaded.get(path)
+    if loaded is not None and loaded.source_hash == source_hash:
+        return loaded
+    
+    rule_set = read_snapshot(snapshot_path(path), source_hash)
+    if rule_set is None:
+        rule_set = RuleSet(json.loads(source.decode('utf-8')), source_hash)
+        try:
+            write_snapshot(rule_set, snapshot_path(path))
+        except OSError:
+            pass  # read-only deployments without a shipped snapshot compile on every cold start
+    _loaded[path] = rule_set
+    return rule_set
+
+
+class RuleReloader:
+    """
+    Watches a rules file and hands every new version to `on_reload`.
+    check() is cheap enough to call on every request: at most once per
+    `interval` seconds one caller stats the file, and if it changed the rules
+    are compiled on a background thread while requests keep being answered
+    with the current rules. A rules file that fails to compile is reported in
+    `last_error` and the current rules stay in place.
+    """
+    
+    def __init__(self, on_reload: Callable[[RuleSet], None], path: str = RULES_PATH,
+                 interval: float = DEFAULT_RELOAD_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        """Start watching `path`; the version on disk now counts as already loaded."""
+        self.on_reload = on_reload
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.reloads = 0
+        self.last_error: Optional[Exception] = None
+        self._signature = self._stat()
+        self._next_check = clock() + interval
+        self._check_lock = threading.Lock()
+        self._rebuilding: Optional[threading.Thread] = None
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Return what identifies a version of the rules file: its mtime and size."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def check(self):
+        """Start a background rebuild if the rules file changed; never waits for one."""
+        if self.clock() < self._next_check or not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = self.clock() + self.interval
+            if self._rebuilding is not None and self._rebuilding.is_alive():
+                return
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return
+            self._signature = signature
+            self._rebuilding = threading.Thread(target=self.reload, name='rule-reloader', daemon=True)
+            self._rebuilding.start()
+        finally:
+            self._check_lock.release()
+    
+    def reload(self) -> bool:
+        """Compile the rules file now and hand it over; return whether that succeeded."""
+        try:
+            rule_set = load_rule_set(self.path)
+        except Exception as error:  # a broken rules file must not take down the service
+            self.last_error = error
+            return False
+        self.on_reload(rule_set)
+        self.last_error = None
+        self.reloads += 1
+        return True
+
+
+def main():
+    """Compile a rules file and write its snapshot."""
+    path = sys.argv[1] if len(sys.argv) > 1 else RULES_PATH
+    rule_set = compile_rules(path)
+    write_snapshot(rule_set, snapshot_path(path))
+    print(f"Compiled {path} -> {snapshot_path(path)} "
+          f"({len(rule_set.keyword_groups)} keyword groups, {len(rule_set.catalog)} responses)")
+
+
+if __name__ == "__main__":
+    # Run from the imported module, so the snapshot refers to rule_loader.RuleSet, not __main__.RuleSet
+    import rule_loader
+    rule_loader.main()
@@ -0,0 +1,266 @@
+"""
+Conversation Sessions
+=====================
+Bounded storage for conversation history.
+Each conversation keeps only its most recent turns in a fixed-capacity ring
+buffer, and the session store caps how many conversations are kept and for
+how long, so memory use does not grow with the number of queries served.
+"""
+
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from responses import ResponseCatalog
+from rule_loader import load_rule_set
+
+DEFAULT_HISTORY_TURNS = 50
+DEFAULT_HISTORY_TEXT_LENGTH = 8000  # characters of user messages kept per conversation
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_SESSION_TTL = 30 * 60  # seconds of inactivity before a session expires
+
+# Session IDs supplied by clients must look like the ones we generate
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{16,64}')
+
+
+class Turn:
+    """
+    One exchange: the user's message and the catalog ID of the assistant's
+    response. Responses come from a small fixed catalog, so storing the ID
+    instead of the text keeps each turn to a few dozen bytes. A turn answered
+    from another catalog than its history's (the rules were reloaded since)
+    keeps a reference to that catalog, since IDs are only stable within one.
+    """
+    __slots__ = ('user_text', 'response_id', 'catalog')
+    
+    def __init__(self, user_text: str, response_id: int, catalog: ResponseCatalog = None):
+        self.user_text = user_text
+        self.response_id = response_id
+        self.catalog = catalog
+
+
+class ConversationHistory:
+    """
+    Fixed-capacity ring buffer of the most recent turns of one conversation.
+    Once full, recording a turn overwrites the oldest one; the oldest turns
+    are also dropped to keep the user messages within `max_text_length`
+    characters in total, so a history never takes more than a fixed amount
+    of memory however long the messages are. Recording and
+    reading take the history's own lock, so concurrent requests of one
+    session are safe and requests of different sessions never contend.
+    Iterating yields
+    ("user", message) and ("assistant", message) pairs, oldest first, with
+    response IDs resolved to their text through the catalog they were
+    answered from: the turn's own, or else the history's (by default the one
+    compiled from rules.json). A history keeps the catalog it was created
+    with, so reloading the rules never changes what past turns say.
+    """
+    __slots__ = ('capacity', 'catalog', 'max_text_length', '_turns', '_next', '_count', '_text_length', '_lock')
+    
+    def __init__(self, capacity: int = DEFAULT_HISTORY_TURNS, catalog: ResponseCatalog = None,
+                 max_text_length: int = DEFAULT_HISTORY_TEXT_LENGTH):
+        """
+        Create an empty history holding at most `capacity` turns, whose user
+        messages add up to at most `max_text_length` characters.
+        """
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1 turn")
+        if max_text_length < 1:
+            raise ValueError("History text length must be at least 1 character")
+        self.capacity = capacity
+        self.catalog = catalog
+        self.max_text_length = max_text_length
+        self._turns: List[Turn] = [None] * capacity
+        self._next = 0
+        self._count = 0
+        self._text_length = 0
+        self._lock = threading.Lock()
+    
+    def record(self, user_text: str, response_id: int, catalog: ResponseCatalog = None):
+        """
+        Store a turn, evicting the oldest one if the buffer is full and as
+        many more as it takes for the message to fit the text budget; a
+        message longer than the whole budget is truncated to it.
+        `catalog` is the one the response ID belongs to, if not the history's.
+        """
+        user_text = user_text[:self.max_text_length]
+        turn = Turn(user_text, response_id, None if catalog is self.catalog else catalog)
+        with self._lock:
+            evicted = self._turns[self._next]
+            if evicted is not None:
+                self._text_length -= len(evicted.user_text)
+                self._count -= 1
+            while self._text_length + len(user_text) > self.max_text_length:
+                oldest = (self._next - self._count) % self.capacity
+                self._text_length -= len(self._turns[oldest].user_text)
+                self._turns[oldest] = None
+                self._count -= 1
+            self._text_length += len(user_text)
+            self._turns[self._next] = turn
+            self._next = (self._next + 1) % self.capacity
+            self._count += 1
+    
+    def turns(self) -> List[Turn]:
+        """Return the stored turns, oldest first."""
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            return [self._turns[(start + offset) % self.capacity] for offset in range(self._count)]
+    
+    def clear(self):
+        """Forget every stored turn."""
+        with self._lock:
+            self._turns = [None] * self.capacity
+            self._next = 0
+            self._count = 0
+            self._text_length = 0
+    
+    @property
+    def text_length(self) -> int:
+        """Total characters of the stored user messages."""
+        return self._text_length
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        catalog = self.catalog if self.catalog is not None else load_rule_set().catalog
+        for turn in self.turns():
+            yield ("user", turn.user_text)
+            yield ("assistant", (catalog if turn.catalog is None else turn.catalog)[turn.response_id].text)
+    
+    def __len__(self) -> int:
+        """Number of (speaker, message) entries, two per turn."""
+        return 2 * self._count
+
+
+# Approximate size of a stored turn besides its message text: the Turn
+# itself, the message's string header and its slot in the ring buffer
+TURN_BYTES = sys.getsizeof(Turn('', 0)) + sys.getsizeof('') + 8
+
+
+class Session:
+    """A conversation's history and when it was last used."""
+    __slots__ = ('history', 'last_seen')
+    
+    def __init__(self, history: ConversationHistory, last_seen: float):
+        self.history = history
+        self.last_seen = last_seen
+
+
+class SessionStore:
+    """
+    In-process store of per-session conversation histories.
+    A session expires after `ttl` seconds without activity, and when more than
+    `max_sessions` are live the least recently used one is evicted. Sessions
+    are kept in least-recently-used order, so expired ones are always at the
+    front and are swept a few at a time on each access instead of by a
+    background thread.
+    """
+    
+    SWEEP_BATCH = 16
+    
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl: float = DEFAULT_SESSION_TTL,
+                 history_turns: int = DEFAULT_HISTORY_TURNS, catalog: ResponseCatalog = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 history_text_length: int = DEFAULT_HISTORY_TEXT_LENGTH):
+        """
+        Create an empty store; `history_turns` and `history_text_length` cap
+        each session's history in turns and in characters of user messages,
+        so the store holds at most `max_sessions` times that, and `catalog`
+        resolves the response IDs stored in it. Assigning a new
+        catalog (e.g. after the rules are reloaded) applies to the sessions
+        created from then on; existing ones keep the catalog they started with.
+        """
+        if max_sessions < 1:
+            raise ValueError("Session store must allow at least 1 session")
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.history_turns = history_turns
+        self.history_text_length = history_text_length
+        self.catalog = catalog
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def new_session_id(self) -> str:
+        """Generate a fresh, unguessable session ID."""
+        return secrets.token_urlsafe(16)
+    
+    def resolve(self, session_id: Optional[str]) -> str:
+        """
+        Return the client's session ID if it is well-formed, otherwise a new
+        one. Anything but a string (e.g. a number in the JSON body) counts as
+        malformed.
+        """
+        if isinstance(session_id, str) and SESSION_ID_PATTERN.fullmatch(session_id):
+            return session_id
+        return self.new_session_id()
+    
+    def get(self, session_id: str) -> ConversationHistory:
+        """
+        Return the history of a session, creating the session if it does not
+        exist or has expired, and mark it as most recently used.
+        """
+        with self._lock:
+            now = self.clock()
+            session = self._sessions.get(session_id)
+            if session is not None and now - session.last_seen <= self.ttl:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+            else:
+                session = Session(ConversationHistory(self.history_turns, self.catalog,
+                                                      self.history_text_length), now)
+                self._sessions[session_id] = session
+                self._sessions.move_to_end(session_id)
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sweep(now)
+            return session.history
+    
+    def discard(self, session_id: str):
+        """Forget a session, if it exists."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+    
+    def sweep(self) -> int:
+        """Remove every expired session and return how many were removed."""
+        with self._lock:
+            return self._sweep(self.clock(), limit=None)
+    
+    def _sweep(self, now: float, limit: Optional[int] = SWEEP_BATCH) -> int:
+        """Pop expired sessions from the least recently used end (caller holds the lock)."""
+        removed = 0
+        sessions = self._sessions
+        while sessions and (limit is None or removed < limit):
+            oldest = next(iter(sessions.values()))
+            if now - oldest.last_seen <= self.ttl:
+                break
+            sessions.popitem(last=False)
+            removed += 1
+        return removed
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the number of live sessions, the turns stored across them and
+        an estimate of the memory those turns take, in bytes.
+        """
+        with self._lock:
+            histories = [session.history for session in self._sessions.values()]
+        turns = 0
+        text_length = 0
+        for history in histories:
+            turns += len(history) // 2
+            text_length += history.text_length
+        return {
+            'sessions': len(histories),
+            'turns': turns,
+            'history_bytes': turns * TURN_BYTES + text_length,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, session_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        return session is not None and self.clock() - session.last_seen <= self.ttl
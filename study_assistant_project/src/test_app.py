@@ -0,0 +1,73 @@
+"""
+Tests for the Web Application
+=============================
+Exercises the Flask app's endpoints through its test client.
+
+Run with `python -m pytest test_app.py` or `python test_app.py`.
+"""
+
+from app import app, assistant
+from metrics import CONTENT_TYPE
+
+
+def test_chat_answers_and_keeps_the_session():
+    client = app.test_client()
+    first = client.post('/chat', json={'message': 'Hello!'})
+    assert first.status_code == 200
+    session_id = first.get_json()['session_id']
+    second = client.post('/chat', json={'message': 'How should I study for mathematics?'})
+    assert second.get_json()['session_id'] == session_id
+    assert 'Mathematics' in second.get_json()['response']
+
+
+def test_chat_replaces_a_session_id_that_is_not_a_string():
+    client = app.test_client()
+    for session_id in (123, ['abcdefghijklmnopqrstuvwxyz'], {'id': 'x'}):
+        reply = client.post('/chat', json={'message': 'hi', 'session_id': session_id})
+        assert reply.status_code == 200
+        assert isinstance(reply.get_json()['session_id'], str)
+
+
+def test_message_over_the_length_limit_is_rejected():
+    client = app.test_client()
+    reply = client.post('/chat', json={'message': 'x' * (assistant.max_input_length + 1)})
+    assert reply.status_code == 413
+    assert str(assistant.max_input_length) in reply.get_json()['response']
+    assert client.post('/chat', json={'message': 'x' * assistant.max_input_length}).status_code == 200
+
+
+def test_body_over_the_content_limit_is_rejected():
+    client = app.test_client()
+    body = '{"message": "' + 'y' * app.config['MAX_CONTENT_LENGTH'] + '"}'
+    reply = client.post('/chat', data=body, content_type='application/json')
+    assert reply.status_code == 413
+    assert 'too long' in reply.get_json()['response']
+
+
+def test_metrics_count_requests_by_route():
+    client = app.test_client()
+    client.get('/health')
+    client.post('/chat', json={'message': 'I have an exam'})
+    reply = client.get('/metrics')
+    assert reply.status_code == 200
+    assert reply.content_type == CONTENT_TYPE
+    text = reply.get_data(as_text=True)
+    assert 'study_assistant_http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'study_assistant_http_request_duration_seconds_bucket{route="/chat",le="+Inf"}' in text
+    assert 'study_assistant_http_request_duration_seconds_count{route="/chat"}' in text
+    assert 'study_assistant_answers_total{category="exam"}' in text
+
+
+def test_metrics_count_made_up_methods_as_other():
+    client = app.test_client()
+    client.open('/health', method='BREW')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'study_assistant_http_requests_total{method="other",route="unmatched",status="405"}' in text
+    assert 'BREW' not in text
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
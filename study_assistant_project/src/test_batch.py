@@ -0,0 +1,110 @@
+"""
+Tests for Batch Answering
+=========================
+Checks that process_queries and, when NumPy is installed, the NumPy batch
+classifier answer a stream of queries exactly like respond() does one at
+a time, including repeated queries (answered once per batch) and streams
+longer than one batch, and that a query over the length limit is answered
+with the too-long message without ending the stream.
+
+Run with `python -m pytest test_batch.py` or `python test_batch.py`.
+"""
+
+import copy
+import itertools
+
+import pytest
+
+from benchmark import CORPORA, generate_queries
+from rule_loader import RuleSet
+from study_assistant import StudyAssistant
+
+try:
+    from batch_classifier import NumpyBatchClassifier
+    import numpy
+except ImportError:  # NumPy is optional
+    numpy = None
+
+requires_numpy = pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+
+ASSISTANT = StudyAssistant(cache_size=0)
+KEYWORDS = sorted({keyword for group in ASSISTANT.keyword_groups.values() for keyword in group})
+
+# Repeats of a few queries, written differently but normalizing alike, among unique ones
+QUERIES = (
+    ['Hello!', 'hello', 'HELLO...', 'How should I study for mathematics?', 'Hello!', 'zzz', '']
+    + generate_queries(CORPORA['chips'], KEYWORDS, 300, 1)
+    + generate_queries(CORPORA['unique'], KEYWORDS, 300, 2)
+)
+
+
+# Limited to 20 characters, with too long queries before, between and after answerable ones
+LIMITED_ASSISTANT = StudyAssistant(cache_size=0, max_input_length=20)
+MIXED_QUERIES = ['I am stressed about my exam', 'hello', 'math exam tips',
+                 'I am stressed about my exam', 'x' * 21, 'hello', 'x' * 20]
+
+
+def expected_texts(queries):
+    return [ASSISTANT.respond(query).response.text for query in queries]
+
+
+def expected_limited_texts(queries):
+    too_long = LIMITED_ASSISTANT.too_long_response()
+    return [too_long if len(query) > 20 else LIMITED_ASSISTANT.respond(query).response.text for query in queries]
+
+
+def test_process_queries_answers_like_respond():
+    assert list(ASSISTANT.process_queries(QUERIES)) == expected_texts(QUERIES)
+
+
+def test_process_queries_across_many_small_batches():
+    assert list(ASSISTANT.process_queries(QUERIES, batch_size=7)) == expected_texts(QUERIES)
+
+
+def test_process_queries_reads_an_endless_stream_lazily():
+    answers = ASSISTANT.process_queries(itertools.cycle(QUERIES), batch_size=100)
+    assert list(itertools.islice(answers, 2 * len(QUERIES))) == 2 * expected_texts(QUERIES)
+
+
+def test_process_queries_answers_too_long_queries_without_stopping():
+    answers = list(LIMITED_ASSISTANT.process_queries(MIXED_QUERIES, batch_size=3))
+    assert answers == expected_limited_texts(MIXED_QUERIES)
+    assert answers[0] == answers[3] == 'Your message is too long. Please keep it under 20 characters.'
+
+
+@requires_numpy
+def test_numpy_classifier_answers_like_respond():
+    classifier = NumpyBatchClassifier(ASSISTANT)
+    assert list(classifier.process_queries(QUERIES)) == expected_texts(QUERIES)
+    assert list(classifier.process_queries(QUERIES, batch_size=7)) == expected_texts(QUERIES)
+
+
+@requires_numpy
+def test_numpy_classifier_matches_keywords_outside_its_word_tables():
+    # Keywords of 1 byte or over 16 bytes are searched for separately
+    spec = copy.deepcopy(ASSISTANT.rules.spec)
+    spec['intents']['exam'].append('study for the exam')
+    spec['subjects']['programming'].append('c')
+    assistant = StudyAssistant(cache_size=0, rules=RuleSet(spec))
+    classifier = NumpyBatchClassifier(assistant)
+    assert len(classifier.other_keywords) == 2
+    queries = ['I will study for the exam', 'abc', 'hello', 'z' * 5000 + ' study for the exam'] + QUERIES
+    expected = [assistant.respond(query).response.text for query in queries]
+    assert list(classifier.process_queries(queries, batch_size=50)) == expected
+
+
+@requires_numpy
+def test_numpy_classifier_answers_too_long_queries_like_process_queries():
+    classifier = NumpyBatchClassifier(LIMITED_ASSISTANT)
+    expected = expected_limited_texts(MIXED_QUERIES)
+    assert list(classifier.process_queries(MIXED_QUERIES)) == expected
+    assert list(classifier.process_queries(MIXED_QUERIES, batch_size=3)) == expected
+    # A batch with nothing to classify
+    assert list(classifier.process_queries(['x' * 21] * 2)) == [LIMITED_ASSISTANT.too_long_response()] * 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,60 @@
+"""
+Tests for Composite Responses
+=============================
+Checks that compose=True answers every category of a query in priority
+order, that composite catalog entries carry the same pre-encoded JSON as
+plain ones, and that their IDs resolve in a conversation history.
+
+Run with `python -m pytest test_compose.py` or `python test_compose.py`.
+"""
+
+import json
+
+from responses import PART_SEPARATOR
+from sessions import ConversationHistory
+from study_assistant import StudyAssistant
+
+COMPOSE = StudyAssistant(compose=True, cache_size=0)
+CATALOG = COMPOSE.catalog
+
+
+def test_parts_follow_the_priority_order():
+    answer = COMPOSE.respond("I'm tired of my calculus exam")
+    assert answer.rule == 2  # the rule that fires first is still reported
+    assert answer.response.key == 'exam+subject:math+motivation'
+    assert answer.response.text == PART_SEPARATOR.join(
+        [CATALOG.by_key('exam').text, CATALOG.by_key('subject:math').text, CATALOG.by_key('motivation').text])
+
+
+def test_single_intent_queries_answer_like_without_compose():
+    plain = StudyAssistant(cache_size=0)
+    for query in ('Hello!', 'How should I study for mathematics?', 'I have a calculus exam', 'zzz'):
+        assert COMPOSE.respond(query).response is plain.respond(query).response
+
+
+def test_composite_json_is_the_encoded_text():
+    for composite_id in set(COMPOSE.rules.composite_ids):
+        response = CATALOG[composite_id]
+        assert response.json == json.dumps(response.text).encode('utf-8'), response.key
+        assert json.loads(response.json) == response.text
+
+
+def test_composites_are_composed_once():
+    composite_id = CATALOG.composite_id(0)
+    assert CATALOG[composite_id] is CATALOG[composite_id]
+    assert CATALOG[composite_id].id == composite_id
+
+
+def test_composite_ids_resolve_in_a_history():
+    history = ConversationHistory(catalog=CATALOG)
+    texts = [COMPOSE.process_query(query, history)
+             for query in ("I'm tired of my calculus exam", 'Hello!', 'History essay and exam schedule tips')]
+    assert [message for speaker, message in history if speaker == 'assistant'] == texts
+    assert any(turn.response_id >= len(CATALOG) for turn in history.turns())  # a composite was stored
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
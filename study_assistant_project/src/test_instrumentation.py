@@ -0,0 +1,74 @@
+"""
+Tests for Query Instrumentation
+===============================
+Checks that per-thread counters add up across threads and are folded into
+the running total when their thread exits, so a server that starts a
+thread per request keeps a bounded number of them.
+
+Run with `python -m pytest test_instrumentation.py` or `python test_instrumentation.py`.
+"""
+
+import gc
+import threading
+
+from instrumentation import QueryStats, ThreadTally
+from study_assistant import StudyAssistant
+
+
+def run_in_threads(target, count: int):
+    for _ in range(count):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+
+def test_counts_of_exited_threads_are_kept_without_their_dicts():
+    tally = ThreadTally()
+    
+    def count():
+        counts = tally.counts()
+        counts['queries'] = counts.get('queries', 0) + 1
+    
+    run_in_threads(count, 200)
+    assert tally.totals() == {'queries': 200}
+    assert len(tally._live) == 0
+
+
+def test_live_and_retired_counts_add_up():
+    tally = ThreadTally()
+    tally.counts()['queries'] = 5
+    
+    def count():
+        tally.counts()['queries'] = 3
+    
+    run_in_threads(count, 2)
+    assert tally.totals() == {'queries': 11}
+    tally.reset()
+    assert tally.totals() == {}
+
+
+def test_stats_count_rule_hits_from_every_thread():
+    assistant = StudyAssistant(instrument=True, cache_size=0)
+    run_in_threads(lambda: assistant.respond('Hello!'), 50)
+    assistant.respond('How should I study for mathematics?')
+    stats = assistant.stats()
+    assert stats['queries'] == 51
+    hits = {rule['category']: rule['hits'] for rule in stats['rules']}
+    assert hits['greeting'] == 50
+    assert hits['subject'] == 1
+
+
+def test_query_stats_reset():
+    stats = QueryStats(rule_count=8)
+    stats.record(1, 0.001, 0.002, 0.003)
+    assert stats.snapshot(['greeting'] + ['other'] * 7)['queries'] == 1
+    stats.reset()
+    assert stats.snapshot(['greeting'] + ['other'] * 7)['queries'] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
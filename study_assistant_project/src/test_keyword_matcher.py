@@ -0,0 +1,82 @@
+"""
+Tests for Keyword Matching
+==========================
+Checks that token matching only finds whole words and consecutive phrases,
+and that fuzzy matching corrects common misspellings of keywords without
+mistaking real words close to a keyword for it.
+
+Run with `python -m pytest test_keyword_matcher.py` or `python test_keyword_matcher.py`.
+"""
+
+from keyword_matcher import AhoCorasickMatcher, TokenMatcher, edit_distance
+from study_assistant import StudyAssistant
+
+GROUPS = {'greeting': ['hi', 'hello'], 'time': ['how long'], 'method': ['study method'], 'history': ['past']}
+
+FUZZY = {mode: StudyAssistant(match_mode=mode, fuzzy=True) for mode in ('substring', 'token', 'stem')}
+
+
+def test_token_keywords_only_match_whole_words():
+    matcher = TokenMatcher(GROUPS)
+    assert matcher.groups_in(matcher.search('this is it')) == []
+    assert matcher.groups_in(matcher.search('pasta for dinner')) == []
+    assert matcher.groups_in(matcher.search('hi there')) == ['greeting']
+    assert matcher.groups_in(matcher.search('in the past')) == ['history']
+    # The substring matcher, by contrast, finds keywords inside other words
+    substring = AhoCorasickMatcher(GROUPS)
+    assert substring.groups_in(substring.search('this pasta')) == ['greeting', 'history']
+
+
+def test_token_phrases_only_match_consecutive_words():
+    matcher = TokenMatcher(GROUPS)
+    assert matcher.groups_in(matcher.search('how long should i study')) == ['time']
+    assert matcher.groups_in(matcher.search('how do i know it is long enough')) == []
+    assert matcher.groups_in(matcher.search('long how')) == []
+    assert matcher.groups_in(matcher.search('a study method that works')) == ['method']
+    assert matcher.groups_in(matcher.search('study a method')) == []
+    assert matcher.groups_in(matcher.search('how long is this study method')) == ['time', 'method']
+
+
+def test_token_mode_answers_by_whole_words():
+    token = StudyAssistant(match_mode='token', cache_size=0)
+    assert token.respond('this is it').category == 'default'
+    assert token.respond('pasta recipes').category == 'default'
+    assert token.respond('hi').category == 'greeting'
+    assert token.respond('how long should I study?').category == 'time'
+    assert token.respond('Is there a good study method?').category == 'method'
+    assert StudyAssistant(cache_size=0).respond('this is it').category == 'greeting'  # substring mode
+
+
+def test_misspelled_keywords_are_recognized():
+    for assistant in FUZZY.values():
+        assert assistant.respond('How do I study mathmatics?').subject == 'math'
+        assert assistant.respond('chemestry homework').subject == 'science'
+        assert assistant.respond('I always procrastinaet').category == 'motivation'
+        assert assistant.respond('I always procastinaet').category == 'motivation'  # two edits
+
+
+def test_real_words_near_a_keyword_are_not_corrected():
+    for assistant in FUZZY.values():
+        assert assistant.respond('I am coming back tomorrow').category == 'default'  # "coding"
+        assert assistant.respond('I am waiting for results').category == 'default'  # "writing"
+        assert assistant.respond('that was hysterical').category == 'default'  # "historical"
+
+
+def test_corrections_keep_the_first_letter():
+    index = FUZZY['token'].rules.fuzzy_index
+    assert index.lookup('calculas')
+    assert not index.lookup('dalculus')
+
+
+def test_edit_distance_counts_transpositions_as_one_edit():
+    assert edit_distance('procrastinaet', 'procrastinate', 2) == 1
+    assert edit_distance('chemestry', 'chemistry', 2) == 1
+    assert edit_distance('mathmatics', 'mathematics', 2) == 1
+    assert edit_distance('hysterical', 'historical', 1) == 2  # gives up past the limit
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,134 @@
+"""
+Tests for the Prometheus Metrics
+================================
+Checks the text format the /metrics endpoint renders, and that the app
+metrics read their stats once per scrape and keep request methods bounded.
+
+Run with `python -m pytest test_metrics.py` or `python test_metrics.py`.
+"""
+
+import threading
+
+from metrics import AppMetrics, MetricsRegistry
+
+
+def sample_lines(text: str):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+
+def test_counter_renders_labels_and_totals():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests.', ('route', 'status'))
+    requests.inc(('/chat', '200'))
+    requests.inc(('/chat', '200'))
+    requests.inc(('/', '404'))
+    text = registry.render()
+    assert '# HELP requests_total Requests.\n# TYPE requests_total counter\n' in text
+    assert sample_lines(text) == [
+        'requests_total{route="/",status="404"} 1',
+        'requests_total{route="/chat",status="200"} 2',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value, ('/chat',))
+    assert sample_lines(registry.render()) == [
+        'latency_seconds_bucket{route="/chat",le="0.1"} 2',
+        'latency_seconds_bucket{route="/chat",le="1.0"} 3',
+        'latency_seconds_bucket{route="/chat",le="+Inf"} 4',
+        'latency_seconds_sum{route="/chat"} 2.65',
+        'latency_seconds_count{route="/chat"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter('odd_total', 'Odd labels.', ('value',)).inc(('say "hi"\\\n',))
+    assert sample_lines(registry.render()) == ['odd_total{value="say \\"hi\\"\\\\\\n"} 1']
+
+
+def test_gauges_are_read_when_rendered():
+    registry = MetricsRegistry()
+    state = {'sessions': 3}
+    registry.gauge('sessions', 'Live sessions.', lambda: state['sessions'])
+    registry.gauge('lookups', 'Lookups.', lambda: [(('hit',), 5), (('miss',), 1)], ('result',))
+    state['sessions'] = 7
+    assert sample_lines(registry.render()) == ['sessions 7', 'lookups{result="hit"} 5', 'lookups{result="miss"} 1']
+
+
+def test_duplicate_names_are_rejected():
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requests.')
+    try:
+        registry.counter('requests_total', 'Requests again.')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("registering a metric name twice should raise ValueError")
+
+
+def test_counts_from_every_thread_are_kept():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests.')
+    
+    def work():
+        for _ in range(1000):
+            requests.inc()
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    requests.inc()
+    assert sample_lines(registry.render()) == ['requests_total 8001']
+
+
+class CountingStats:
+    """Stands in for the assistant and the session store, counting stats() calls."""
+    
+    def __init__(self, stats):
+        self._stats = stats
+        self.calls = 0
+    
+    def stats(self):
+        self.calls += 1
+        return self._stats
+
+
+def make_app_metrics():
+    assistant = CountingStats({'enabled': False, 'cache': {'hits': 3, 'misses': 1, 'hit_ratio': 0.75, 'size': 1}})
+    sessions = CountingStats({'sessions': 2, 'turns': 5, 'history_bytes': 900})
+    return AppMetrics(assistant, sessions), assistant, sessions
+
+
+def test_app_metrics_read_stats_once_per_scrape():
+    metrics, assistant, sessions = make_app_metrics()
+    text = metrics.render()
+    assert (assistant.calls, sessions.calls) == (1, 1)
+    assert 'study_assistant_sessions 2' in text
+    assert 'study_assistant_history_bytes 900' in text
+    assert 'study_assistant_query_cache_hit_ratio 0.75' in text
+    assert '# TYPE study_assistant_query_cache_lookups counter' in text
+    assert 'study_assistant_query_cache_lookups{result="miss"} 1' in text
+
+
+def test_unknown_request_methods_are_counted_as_other():
+    metrics, _, _ = make_app_metrics()
+    for method in ('GET', 'POST', 'BREW', 'X-1', 'GET'):
+        metrics.observe_request(method, '/chat', 405, 0.001)
+    assert [line for line in sample_lines(metrics.render()) if line.startswith('study_assistant_http_requests')] == [
+        'study_assistant_http_requests_total{method="GET",route="/chat",status="405"} 2',
+        'study_assistant_http_requests_total{method="POST",route="/chat",status="405"} 1',
+        'study_assistant_http_requests_total{method="other",route="/chat",status="405"} 2',
+    ]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,46 @@
+"""
+Tests for the Input Normalizer
+==============================
+Checks that plain-ASCII input, which takes a byte-level fast path, is
+normalized exactly like the same text on the Unicode path.
+
+Run with `python -m pytest test_normalizer.py` or `python test_normalizer.py`.
+"""
+
+from normalizer import normalize
+
+# Appending a non-ASCII word sends otherwise identical text down the Unicode path
+UNICODE_SUFFIX = ' é'
+
+
+def unicode_path(text: str) -> str:
+    normalized = normalize(text + UNICODE_SUFFIX)
+    assert normalized.endswith(UNICODE_SUFFIX.strip())
+    return normalized[:-len(UNICODE_SUFFIX.strip())].rstrip()
+
+
+def test_ascii_and_unicode_paths_agree_on_every_ascii_character():
+    for codepoint in range(128):
+        text = f'Math{chr(codepoint)}Exam'
+        assert normalize(text) == unicode_path(text), repr(text)
+
+
+def test_ascii_and_unicode_paths_agree_on_queries():
+    for text in ("What's the best way to study?!", 'math+exam', 'a<b>c=d', '$5 ^ `code` | ~home~',
+                 '  spaced    out  ', 'HOW-LONG... (really)', 'x_y'):
+        assert normalize(text) == unicode_path(text), repr(text)
+
+
+def test_symbols_and_punctuation_become_spaces():
+    assert normalize('math+exam') == 'math exam'
+    assert normalize('math+exam é') == 'math exam é'
+    assert normalize('exam → tomorrow ★') == 'exam tomorrow'
+    assert normalize('ｍａｔｈ？！') == 'math'
+    assert normalize("what’s up") == 'whats up'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,79 @@
+"""
+Tests for the Query Cache
+=========================
+Checks LRU eviction, the hit/miss counters and how the assistant uses
+the cache.
+
+Run with `python -m pytest test_query_cache.py` or `python test_query_cache.py`.
+"""
+
+from query_cache import QueryCache
+from study_assistant import MAX_CACHED_QUERY_LENGTH, StudyAssistant
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_hits_and_misses_are_counted():
+    cache = QueryCache(maxsize=4)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('a')
+    cache.get('missing')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size'], stats['maxsize']) == (2, 1, 1, 4)
+    assert stats['hit_ratio'] == 2 / 3
+    cache.clear()
+    assert cache.stats()['hits'] == 0 and len(cache) == 0
+
+
+def test_get_or_compute_computes_each_key_once():
+    cache = QueryCache(maxsize=4)
+    computed = []
+    
+    def compute(key):
+        computed.append(key)
+        return key.upper()
+    
+    assert cache.get_or_compute('x', compute) == 'X'
+    assert cache.get_or_compute('x', compute) == 'X'
+    assert computed == ['x']
+
+
+def test_size_must_be_positive():
+    try:
+        QueryCache(maxsize=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("QueryCache(maxsize=0) should raise ValueError")
+
+
+def test_assistant_caches_by_normalized_query():
+    assistant = StudyAssistant(cache_size=8)
+    assistant.process_query("Help me with MATH!")
+    assistant.process_query("help me with math")
+    stats = assistant.query_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_long_queries_are_not_cached():
+    assistant = StudyAssistant(cache_size=8)
+    assistant.process_query("math " * MAX_CACHED_QUERY_LENGTH)
+    assert len(assistant.query_cache) == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,75 @@
+"""
+Tests for Intent Ranking
+========================
+Checks that rank_intents scores every category a query mentions, drops
+weak ones below the confidence threshold, and breaks ties in rule priority
+order, so that with one keyword per category its top entry is the rule
+apply_rules picks.
+
+Run with `python -m pytest test_ranking.py` or `python test_ranking.py`.
+"""
+
+import itertools
+
+from rule_loader import Ranked, RuleSet
+from study_assistant import StudyAssistant
+
+ASSISTANT = StudyAssistant(cache_size=0)
+RULES = ASSISTANT.rules
+
+
+def one_hit_each(categories):
+    """Matcher counts, bitmask and subject of a query with one keyword of each category."""
+    counts = [0] * len(RULES.keyword_groups)
+    hits = 0
+    for category in categories:
+        index = RULES.category_groups[RULES.priority.index(category)][0]
+        counts[index] = 1
+        hits |= 1 << index
+    subject = RULES.subjects[1] if 'subject' in categories else None
+    return counts, hits, subject
+
+
+def test_tired_and_lazy_before_an_exam_ranks_motivation_first():
+    ranking = ASSISTANT.rank_intents("I'm tired and lazy, it's so hard before my exam")
+    assert [(ranked.category, ranked.confidence) for ranked in ranking] == [('motivation', 0.75), ('exam', 0.25)]
+    assert ranking[0].rule == RULES.priority.index('motivation') + 1
+    assert ranking[0].score == 3.0
+
+
+def test_categories_below_the_threshold_are_dropped():
+    query = "I'm tired and lazy, it's so hard before my exam"
+    assert [ranked.category for ranked in ASSISTANT.rank_intents(query, threshold=0.3)] == ['motivation']
+    assert [ranked.category for ranked in ASSISTANT.rank_intents(query, threshold=0.0)] == ['motivation', 'exam']
+    # The top category is kept however low its confidence
+    counts, _, _ = one_hit_each(['greeting', 'exam', 'time', 'motivation', 'method'])
+    assert [ranked.category for ranked in RULES.rank(counts, threshold=0.9)] == ['greeting']
+
+
+def test_a_query_without_keywords_ranks_only_the_default():
+    assert ASSISTANT.rank_intents('zzz') == [Ranked('default', RULES.default_rule, 0.0, 1.0)]
+    assert ASSISTANT.rank_intents('') == [Ranked('default', RULES.default_rule, 0.0, 1.0)]
+
+
+def test_ties_keep_the_priority_order_of_apply_rules():
+    for size in range(1, len(RULES.priority) + 1):
+        for categories in itertools.combinations(RULES.priority, size):
+            counts, hits, subject = one_hit_each(categories)
+            ranking = RULES.rank(counts, threshold=0.0)
+            assert ranking[0].rule == RULES.apply_rules(hits, subject), categories
+            assert [ranked.category for ranked in ranking] == [c for c in RULES.priority if c in categories]
+            assert all(ranked.confidence == 1 / size for ranked in ranking)
+
+
+def test_weights_scale_scores():
+    spec = dict(RULES.spec, weights={**RULES.spec.get('weights', {}), 'exam': 4})
+    assistant = StudyAssistant(cache_size=0, rules=RuleSet(spec))
+    ranking = assistant.rank_intents("I'm tired and lazy, it's so hard before my exam")
+    assert [(ranked.category, ranked.score) for ranked in ranking] == [('exam', 4.0), ('motivation', 3.0)]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
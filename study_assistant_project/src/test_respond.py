@@ -0,0 +1,79 @@
+"""
+Tests for Answering Queries
+===========================
+Checks that stopping the match early never changes an answer, whatever
+the match mode or the length of the text, and that over-long input is
+rejected in the API and in the interactive chat alike.
+
+Run with `python -m pytest test_respond.py` or `python test_respond.py`.
+"""
+
+import builtins
+
+from keyword_matcher import SEARCH_CHUNK
+from study_assistant import InputTooLongError, StudyAssistant
+
+MODES = ('substring', 'token', 'stem')
+
+# Enough filler to push the substring matcher past its first chunk
+PADDING = ' and then' * (SEARCH_CHUNK // 8)
+
+
+def test_a_greeting_decides_the_answer_without_a_subject():
+    for mode in MODES:
+        assistant = StudyAssistant(match_mode=mode, cache_size=0)
+        for query in ('hi, can you help me with math', 'hi, can you help me with math' + PADDING,
+                      'hi' + PADDING + ' can you help me with math'):
+            answer = assistant.respond(query)
+            assert (answer.category, answer.subject) == ('greeting', None), (mode, query[:40])
+
+
+def test_an_undecided_answer_keeps_its_subject():
+    for mode in MODES:
+        assistant = StudyAssistant(match_mode=mode, cache_size=0)
+        for query in ('can you help me with math', 'can you help me with math' + PADDING):
+            assert assistant.respond(query).subject == 'math', (mode, query[:40])
+
+
+def test_early_stop_gives_the_same_response_as_a_full_match():
+    for mode in MODES:
+        assistant = StudyAssistant(match_mode=mode, cache_size=0)
+        for query in ('hello, I have a math exam' + PADDING, PADDING + ' hey, history essay help'):
+            hits = assistant.active.matcher.search(assistant.normalize_input(query))  # no early stop
+            full = assistant.rules.decision_table[assistant.decision_index(hits)]
+            assert assistant.respond(query).response is full.response, (mode, query[:40])
+
+
+def test_over_long_input_is_rejected():
+    assistant = StudyAssistant(max_input_length=100)
+    try:
+        assistant.respond('x' * 101)
+    except InputTooLongError as error:
+        assert '100' in str(error)
+    else:
+        raise AssertionError("InputTooLongError was not raised")
+    assert assistant.respond('x' * 100).category == 'default'
+
+
+def test_chat_reports_over_long_input_and_carries_on():
+    assistant = StudyAssistant(max_input_length=100)
+    inputs = iter(['x' * 101, 'hello', 'quit'])
+    printed = []
+    real_input, real_print = builtins.input, builtins.print
+    builtins.input = lambda prompt='': next(inputs)
+    builtins.print = lambda *args, **kwargs: printed.append(' '.join(map(str, args)))
+    try:
+        assistant.chat()
+    finally:
+        builtins.input, builtins.print = real_input, real_print
+    output = '\n'.join(printed)
+    assert 'Please keep it under 100 characters.' in output
+    assert assistant.catalog.by_key('greeting').text in output
+    assert len(assistant.conversation_history) == 2  # only the greeting was recorded
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
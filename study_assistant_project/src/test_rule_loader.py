@@ -0,0 +1,117 @@
+"""
+Tests for the Rule Loader
+=========================
+Checks that the snapshot shipped with the Vercel deployment matches its
+rules file, and that the rule reloader picks up a changed rules file at
+most once per interval and keeps the current rules when it is broken, and
+that keywords normalization would change are rejected.
+
+Run with `python -m pytest test_rule_loader.py` or `python test_rule_loader.py`.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from rule_loader import RULES_PATH, RuleError, RuleReloader, RuleSet, read_snapshot, snapshot_path
+
+API_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api', 'rules.json')
+
+
+def test_deployed_snapshot_matches_the_rules_file():
+    # Vercel's filesystem is read-only, so a stale snapshot means compiling on every cold start;
+    # rebuild it with `python rule_loader.py` in api/ after changing the rules or SNAPSHOT_VERSION
+    with open(API_RULES_PATH, 'rb') as rules_file:
+        source_hash = hashlib.sha256(rules_file.read()).hexdigest()
+    assert read_snapshot(snapshot_path(API_RULES_PATH), source_hash) is not None
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def make_reloader(directory: str):
+    path = os.path.join(directory, 'rules.json')
+    shutil.copy(RULES_PATH, path)
+    clock = FakeClock()
+    loaded = []
+    return RuleReloader(loaded.append, path, interval=2.0, clock=clock), clock, loaded
+
+
+def edit_greeting(path: str, greeting: str):
+    with open(RULES_PATH, encoding='utf-8') as rules_file:
+        spec = json.load(rules_file)
+    spec['responses']['greeting'] = greeting
+    with open(path, 'w', encoding='utf-8') as rules_file:
+        json.dump(spec, rules_file)
+
+
+def wait_for_reloads(reloader: RuleReloader, count: int):
+    deadline = time.monotonic() + 10
+    while reloader.reloads < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_reloader_compiles_a_changed_file_once_the_interval_passes():
+    with tempfile.TemporaryDirectory() as directory:
+        reloader, clock, loaded = make_reloader(directory)
+        edit_greeting(reloader.path, 'Welcome back!')
+        reloader.check()
+        assert reloader.reloads == 0  # the interval has not passed yet
+        clock.advance(2.0)
+        reloader.check()
+        wait_for_reloads(reloader, 1)
+        assert reloader.reloads == 1
+        assert loaded[0].catalog.by_key('greeting').text == 'Welcome back!'
+        
+        clock.advance(2.0)
+        reloader.check()  # unchanged since the last reload
+        time.sleep(0.05)
+        assert reloader.reloads == 1
+
+
+def test_reloader_keeps_the_rules_when_the_file_is_broken():
+    with tempfile.TemporaryDirectory() as directory:
+        reloader, _, loaded = make_reloader(directory)
+        with open(reloader.path, 'w', encoding='utf-8') as rules_file:
+            rules_file.write('{"name": ')
+        assert not reloader.reload()
+        assert loaded == []
+        assert reloader.last_error is not None
+        edit_greeting(reloader.path, 'Fixed!')
+        assert reloader.reload()
+        assert reloader.last_error is None
+        assert loaded[0].catalog.by_key('greeting').text == 'Fixed!'
+
+
+def test_keywords_that_normalization_changes_are_rejected():
+    # queries are normalized before matching, so these keywords could never match
+    for section, category, keyword in [('intents', 'greeting', "what's up"),
+                                       ('subjects', 'programming', 'c++'),
+                                       ('intents', 'exam', 'Exam')]:
+        with open(RULES_PATH, encoding='utf-8') as rules_file:
+            spec = json.load(rules_file)
+        spec[section][category].append(keyword)
+        with pytest.raises(RuleError, match='not normalized'):
+            RuleSet(spec, 'test')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
@@ -0,0 +1,171 @@
+"""
+Tests for Conversation Sessions
+===============================
+Checks the session store's ID validation, inactivity expiry, LRU eviction
+and amortized sweeping, using a fake clock instead of waiting, and that
+histories keep their answers when the rules are swapped.
+
+Run with `python -m pytest test_sessions.py` or `python test_sessions.py`.
+"""
+
+import copy
+
+from rule_loader import RuleSet
+from sessions import TURN_BYTES, SessionStore
+from study_assistant import StudyAssistant
+
+CATALOG = StudyAssistant().catalog
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def make_store(**options):
+    clock = FakeClock()
+    return SessionStore(catalog=CATALOG, clock=clock, **options), clock
+
+
+def session_id(number: int) -> str:
+    return f'session{number:012d}'
+
+
+def test_resolve_keeps_well_formed_ids():
+    store, _ = make_store()
+    assert store.resolve('abcdefghij_KLMNOP-0123') == 'abcdefghij_KLMNOP-0123'
+
+
+def test_resolve_replaces_malformed_ids():
+    store, _ = make_store()
+    for bad in (None, '', 'short', 'has spaces in it here', 'x' * 65, '../../etc/passwd_xx', 123, 12.5, ['a' * 20]):
+        resolved = store.resolve(bad)
+        assert resolved != bad
+        assert store.resolve(resolved) == resolved
+
+
+def test_session_expires_after_ttl():
+    store, clock = make_store(ttl=60)
+    store.get(session_id(1)).record('hello', 0)
+    clock.advance(59)
+    assert session_id(1) in store
+    assert len(store.get(session_id(1))) == 2  # still the same history
+    clock.advance(61)
+    assert session_id(1) not in store
+    assert len(store.get(session_id(1))) == 0  # expired, so a fresh history
+
+
+def test_access_keeps_session_alive():
+    store, clock = make_store(ttl=60)
+    store.get(session_id(1)).record('hello', 0)
+    for _ in range(5):
+        clock.advance(50)
+        store.get(session_id(1))
+    assert len(store.get(session_id(1))) == 2
+
+
+def test_least_recently_used_session_is_evicted_at_capacity():
+    store, _ = make_store(max_sessions=3)
+    for number in (1, 2, 3):
+        store.get(session_id(number))
+    store.get(session_id(1))  # 2 is now the least recently used
+    store.get(session_id(4))
+    assert len(store) == 3
+    assert session_id(2) not in store
+    assert all(session_id(number) in store for number in (1, 3, 4))
+
+
+def test_get_sweeps_a_batch_of_expired_sessions():
+    store, clock = make_store(ttl=60)
+    for number in range(40):
+        store.get(session_id(number))
+    clock.advance(61)
+    store.get(session_id(100))
+    assert len(store) == 40 - SessionStore.SWEEP_BATCH + 1
+    store.get(session_id(101))
+    assert len(store) == 40 - 2 * SessionStore.SWEEP_BATCH + 2
+    assert store.sweep() == 40 - 2 * SessionStore.SWEEP_BATCH
+    assert len(store) == 2
+
+
+def test_history_keeps_only_the_latest_turns():
+    store, _ = make_store(history_turns=2)
+    history = store.get(session_id(1))
+    for number in range(5):
+        history.record(f'message {number}', 0)
+    assert [turn.user_text for turn in history.turns()] == ['message 3', 'message 4']
+
+
+def test_history_drops_the_oldest_turns_to_stay_within_its_text_budget():
+    store, _ = make_store(history_turns=10, history_text_length=100)
+    history = store.get(session_id(1))
+    for number in range(5):
+        history.record(f'{number}' * 30, 0)
+    assert [turn.user_text[0] for turn in history.turns()] == ['2', '3', '4']
+    assert history.text_length == 90
+    history.record('x' * 250, 0)  # longer than the whole budget
+    assert [turn.user_text for turn in history.turns()] == ['x' * 100]
+    assert history.text_length == 100
+    history.record('short', 0)
+    assert [turn.user_text for turn in history.turns()] == ['short']
+
+
+def test_stored_text_is_bounded_however_long_the_messages():
+    store, _ = make_store(max_sessions=3, history_turns=4, history_text_length=50)
+    for number in range(10):
+        for _ in range(10):
+            store.get(session_id(number)).record('y' * 1000, 0)
+    assert store.stats() == {'sessions': 3, 'turns': 3, 'history_bytes': 3 * TURN_BYTES + 3 * 50}
+
+
+def test_stats_count_sessions_and_turns():
+    store, _ = make_store()
+    store.get(session_id(1)).record('hello', 0)
+    store.get(session_id(2)).record('hi', 0)
+    store.get(session_id(2)).record('help', 0)
+    stats = store.stats()
+    assert stats['sessions'] == 2
+    assert stats['turns'] == 3
+    assert stats['history_bytes'] > len('hellohihelp')
+
+
+
+def test_history_keeps_its_answers_when_the_rules_are_swapped():
+    assistant = StudyAssistant(cache_size=0)
+    store = SessionStore(catalog=assistant.catalog)
+    history = store.get(session_id(1))
+    assistant.process_query('Hello!', history)
+    assistant.process_query('How should I study for mathematics?', history)
+    before = list(history)
+    
+    # Edit a text and drop a subject, which renumbers every response after it
+    spec = copy.deepcopy(assistant.rules.spec)
+    spec['responses']['greeting'] = 'Welcome back!'
+    del spec['subjects']['math'], spec['subject_advice']['math']
+    rules = RuleSet(spec)
+    store.catalog = rules.catalog
+    assistant.use_rules(rules)
+    
+    history = store.get(session_id(1))
+    assert list(history) == before
+    assistant.process_query('Hello!', history)
+    assert list(history)[-1] == ('assistant', 'Welcome back!')
+    assert list(history)[:4] == before
+    fresh = store.get(session_id(2))
+    assistant.process_query('Hello!', fresh)
+    assert list(fresh) == [('user', 'Hello!'), ('assistant', 'Welcome back!')]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")
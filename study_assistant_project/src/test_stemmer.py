@@ -0,0 +1,46 @@
+"""
+Tests for the Stemmer
+=====================
+Checks that inflections of the keywords students use reduce to one stem.
+
+Run with `python -m pytest test_stemmer.py` or `python test_stemmer.py`.
+"""
+
+from stemmer import stem
+from study_assistant import StudyAssistant
+
+
+def test_inflections_share_a_stem():
+    for words in (
+        ('procrastinate', 'procrastinating', 'procrastination'),
+        ('exam', 'exams'),
+        ('schedule', 'scheduling'),
+        ('study', 'studies', 'studied'),
+        ('plan', 'planning'),
+    ):
+        assert len({stem(word) for word in words}) == 1, words
+
+
+def test_words_ending_in_s_keep_it():
+    for word in ('class', 'calculus', 'analysis'):
+        assert stem(word) == word
+
+
+def test_short_stems_are_left_alone():
+    assert stem('being') == 'being'
+    assert stem('is') == 'is'
+
+
+def test_stem_mode_matches_inflected_keywords():
+    assistant = StudyAssistant(match_mode='stem')
+    token = StudyAssistant(match_mode='token')
+    query = "I keep procrastinating on my homework"
+    assert assistant.respond(query).category == 'motivation'
+    assert token.respond(query).category != 'motivation'
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: passed")